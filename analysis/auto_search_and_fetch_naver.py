@@ -1,13 +1,26 @@
 # analysis/auto_search_and_fetch_naver.py
 
 import os
+import sys
 import time
+import hashlib
+import threading
 import urllib.parse
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
 
-import requests
+import orjson
 from bs4 import BeautifulSoup
 
+# 어디서 실행하든(프로젝트 루트, python -m analysis.xxx) 같은 폴더의 모듈을 import 할 수 있도록
+_ANALYSIS_DIR = os.path.dirname(os.path.abspath(__file__))
+if _ANALYSIS_DIR not in sys.path:
+    sys.path.insert(0, _ANALYSIS_DIR)
+
+from http_fetch import SESSION, fetch_text_from_url, host_semaphore, wait_for_host_slot  # noqa: E402
+from seat_popularity import build_seat_sidecar, seat_sidecar_path  # noqa: E402
+
 # --- DOLBY 8개 지점 고정 상수 ---
 MEGABOX_DOLBY_BRANCHES: Dict[str, str] = {
     "0019": "남양주현대아울렛스페이스원",
@@ -23,17 +36,23 @@ MEGABOX_DOLBY_BRANCHES: Dict[str, str] = {
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 REVIEW_DIR = os.path.join(BASE_DIR, "data", "seat_reviews")
 
-DEFAULT_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    )
-}
+# 가져온 본문 텍스트 디스크 캐시 (URL sha1 → 텍스트 파일)
+# CATCHSEAT_REFRESH=1 로 실행하면 캐시를 무시하고 다시 가져옴
+HTTP_CACHE_DIR = os.path.join(BASE_DIR, "data", ".httpcache")
+HTTP_CACHE_TTL_SEC = 7 * 24 * 60 * 60
+FORCE_REFRESH = os.getenv("CATCHSEAT_REFRESH") == "1"
 
 # 네이버 검색에서 건져올 웹페이지 URL 최대 개수
 MAX_RESULTS_PER_BRANCH = 20
 
+# 네이버 검색 OpenAPI (키가 있으면 HTML 대신 JSON 응답 사용)
+NAVER_OPENAPI_URL = "https://openapi.naver.com/v1/search/webkr.json"
+NAVER_CLIENT_ID = os.environ.get("CATCHSEAT_NAVER_CLIENT_ID")
+NAVER_CLIENT_SECRET = os.environ.get("CATCHSEAT_NAVER_CLIENT_SECRET")
+
+# 동시에 진행할 최대 요청 수
+MAX_WORKERS = 16
+
 # 자동 수집 시 허용할 도메인 (필요하면 추가/삭제 가능)
 ALLOWED_DOMAINS = [
     "blog.naver.com",
@@ -42,6 +61,8 @@ ALLOWED_DOMAINS = [
     "dcinside.com",
     "gall.dcinside.com",
 ]
+# str.endswith에 튜플로 넘기면 한 번의 호출로 모든 도메인을 검사
+ALLOWED_DOMAINS_TUPLE = tuple(ALLOWED_DOMAINS)
 
 # 지점 이름이 실제 본문에 어떻게 등장할 수 있는지, 패턴을 조금 넓게 정의
 BRANCH_NAME_PATTERNS: Dict[str, List[str]] = {
@@ -105,39 +126,21 @@ def build_query(branch_name: str) -> str:
     return f"메가박스 {branch_name} 돌비시네마 명당 좌석 후기"
 
 
-def search_naver_web(query: str, max_results: int = MAX_RESULTS_PER_BRANCH) -> List[str]:
+def _filter_allowed_urls(hrefs: Iterable[str], max_results: int) -> List[str]:
     """
-    네이버 웹 검색 결과에서 상위 max_results개의 URL을 가져옵니다.
-    (실제 서비스에서는 약관/robots.txt를 반드시 확인해야 합니다.)
+    허용 도메인에 해당하는 http(s) URL만 중복 없이 최대 max_results개 골라냅니다.
     """
-    base_url = "https://search.naver.com/search.naver"
-    params = {
-        "where": "web",
-        "sm": "tab_jum",
-        "query": query,
-    }
-
-    try:
-        resp = requests.get(base_url, params=params, headers=DEFAULT_HEADERS, timeout=10)
-        resp.raise_for_status()
-    except Exception as e:
-        print(f"[ERROR] 네이버 검색 실패: {query} ({e})")
-        return []
-
-    soup = BeautifulSoup(resp.text, "html.parser")
     results: List[str] = []
     seen = set()
 
-    # a 태그 중에서 href가 있고, 허용 도메인에 해당하는 것만 사용
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
+    for href in hrefs:
         if not href.startswith("http"):
             continue
 
         parsed = urllib.parse.urlparse(href)
         host = parsed.netloc.lower()
 
-        if not any(host.endswith(domain) for domain in ALLOWED_DOMAINS):
+        if not host.endswith(ALLOWED_DOMAINS_TUPLE):
             continue
 
         # URL 중복 제거
@@ -152,61 +155,175 @@ def search_naver_web(query: str, max_results: int = MAX_RESULTS_PER_BRANCH) -> L
     return results
 
 
-def fetch_text_from_url(url: str, timeout: int = 10) -> str:
+def _search_naver_openapi(query: str, max_results: int) -> List[str]:
+    """
+    네이버 검색 OpenAPI(JSON)로 웹문서 검색 결과 URL을 가져옵니다.
+    """
+    headers = {
+        "X-Naver-Client-Id": NAVER_CLIENT_ID,
+        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET,
+    }
+    params = {
+        "query": query,
+        # 허용 도메인 필터로 일부 걸러지므로 넉넉하게 받아둠 (API 최대 100)
+        "display": 100,
+    }
+
+    try:
+        resp = SESSION.get(NAVER_OPENAPI_URL, params=params, headers=headers, timeout=10)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+    except Exception as e:
+        print(f"[ERROR] 네이버 OpenAPI 검색 실패: {query} ({e})")
+        return []
+
+    links = (item.get("link", "") for item in data.get("items", []))
+    return _filter_allowed_urls(links, max_results)
+
+
+def _search_naver_html(query: str, max_results: int) -> List[str]:
     """
-    주어진 URL에서 HTML을 가져와 텍스트만 추출합니다.
+    네이버 웹 검색 결과 HTML에서 링크를 긁어옵니다. (OpenAPI 키가 없을 때 사용)
     """
+    base_url = "https://search.naver.com/search.naver"
+    params = {
+        "where": "web",
+        "sm": "tab_jum",
+        "query": query,
+    }
+
     try:
-        resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=timeout)
+        resp = SESSION.get(base_url, params=params, timeout=10)
         resp.raise_for_status()
     except Exception as e:
-        print(f"[ERROR] 요청 실패: {url} ({e})")
+        print(f"[ERROR] 네이버 검색 실패: {query} ({e})")
+        return []
+
+    soup = BeautifulSoup(resp.text, "lxml")
+
+    # a 태그 중에서 href가 있고, 허용 도메인에 해당하는 것만 사용
+    hrefs = (a["href"] for a in soup.select("a[href]"))
+    return _filter_allowed_urls(hrefs, max_results)
+
+
+def search_naver_web(query: str, max_results: int = MAX_RESULTS_PER_BRANCH) -> List[str]:
+    """
+    네이버 웹 검색 결과에서 상위 max_results개의 URL을 가져옵니다.
+    CATCHSEAT_NAVER_CLIENT_ID / CATCHSEAT_NAVER_CLIENT_SECRET 이 설정되어 있으면
+    OpenAPI(JSON)를 쓰고, 없으면 검색 결과 HTML을 파싱합니다.
+    (실제 서비스에서는 약관/robots.txt를 반드시 확인해야 합니다.)
+    """
+    if NAVER_CLIENT_ID and NAVER_CLIENT_SECRET:
+        return _search_naver_openapi(query, max_results)
+    return _search_naver_html(query, max_results)
+
+
+def _cache_path(url: str) -> str:
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.txt")
+
+
+def load_cached_text(url: str) -> str:
+    """
+    캐시에 아직 만료되지 않은 본문이 있으면 반환하고, 없으면 빈 문자열을 반환합니다.
+    """
+    if FORCE_REFRESH:
         return ""
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    path = _cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) > HTTP_CACHE_TTL_SEC:
+            return ""
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
 
-    # script, style, noscript 제거
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
 
-    text = soup.get_text("\n")
+def store_cached_text(url: str, text: str) -> None:
+    """
+    가져온 본문을 캐시에 저장합니다. (임시 파일에 쓰고 교체해서 반쯤 쓰인 파일이 남지 않게 함)
+    """
+    path = _cache_path(url)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] 캐시 저장 실패: {url} ({e})")
 
-    lines = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        lines.append(line)
 
-    cleaned = "\n".join(lines)
-    return cleaned
+def fetch_text_politely(url: str) -> str:
+    """
+    호스트별 동시 요청 수를 제한한 상태로 fetch_text_from_url을 호출합니다.
+    다른 호스트 요청은 그동안 병렬로 진행됩니다.
+    캐시에 있는 URL은 네트워크 요청 없이 바로 반환합니다.
+    """
+    cached = load_cached_text(url)
+    if cached:
+        return cached
+
+    with host_semaphore(url):
+        # 너무 빠르게 요청 보내지 않도록 호스트별로 간격 두기
+        wait_for_host_slot(url)
+        text = fetch_text_from_url(url)
+
+    if text:
+        store_cached_text(url, text)
+    return text
 
 
 def save_review_text(branch_code: str, idx: int, text: str, source: str) -> None:
     """
     지점별 seat_reviews/{branch_code}/auto_search_naver_{idx}.txt 파일로 저장합니다.
     파일 상단에 출처 URL을 주석처럼 남겨둡니다.
+    같은 이름의 .json 사이드카에 좌석 추출 결과를 같이 저장해서
+    seat_popularity.py가 본문을 다시 분석하지 않아도 되게 합니다.
+    (지점 디렉토리는 main에서 지점마다 한 번만 만들어 둡니다.)
     """
     branch_dir = os.path.join(REVIEW_DIR, branch_code)
-    os.makedirs(branch_dir, exist_ok=True)
 
     filename = f"auto_search_naver_{idx:03d}.txt"
     path = os.path.join(branch_dir, filename)
 
     header = f"# SOURCE: {source}\n\n"
+    content = header + text
+    # 헤더와 본문을 한 번에 기록
     with open(path, "w", encoding="utf-8") as f:
-        f.write(header)
-        f.write(text)
+        f.write(content)
+
+    # 텍스트 파일보다 나중에 써야 사이드카가 최신으로 인정됨
+    sidecar = build_seat_sidecar(content, source)
+    with open(seat_sidecar_path(path), "wb") as f:
+        f.write(orjson.dumps(sidecar))
 
     print(f"[SAVE] {branch_code} -> {filename} ({len(text)} chars)")
 
 
+@lru_cache(maxsize=None)
+def _branch_search_patterns(branch_code: str) -> Tuple[str, ...]:
+    """
+    지점 패턴 중 다른 (더 짧은) 패턴을 포함하는 것은 빼고 남깁니다.
+    예: '코엑스'가 있으면 '메가박스 코엑스'는 따로 검사할 필요가 없음.
+    (본문 전체를 훑는 횟수를 줄이기 위함, 결과는 동일)
+    """
+    patterns = BRANCH_NAME_PATTERNS.get(branch_code) or []
+    # 짧은 패턴부터 검사하도록 정렬
+    ordered = sorted(set(patterns), key=len)
+    kept: List[str] = []
+    for p in ordered:
+        if not any(k in p for k in kept):
+            kept.append(p)
+    return tuple(kept)
+
+
 def text_matches_branch(branch_code: str, text: str) -> bool:
     """
     본문 텍스트 안에 해당 지점을 가리키는 표현이 실제로 포함되어 있는지 확인합니다.
     지점별로 여러 패턴(예: '스타필드 하남', '메가박스 하남' 등)을 허용합니다.
     """
-    patterns = BRANCH_NAME_PATTERNS.get(branch_code)
+    patterns = _branch_search_patterns(branch_code)
     if not patterns:
         # 패턴 정보가 없으면 일단 통과시키거나, 보수적으로 False로 둘 수 있음.
         # 여기서는 일단 통과시키도록 함.
@@ -217,40 +334,48 @@ def text_matches_branch(branch_code: str, text: str) -> bool:
 
 def main():
     os.makedirs(REVIEW_DIR, exist_ok=True)
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # 1) 지점별 검색 → URL 본문 요청을 바로 작업 큐에 올림
+        #    (다음 지점을 검색하는 동안 앞 지점의 본문 요청이 병렬로 진행됨)
+        jobs = []
+        for branch_code, branch_name in MEGABOX_DOLBY_BRANCHES.items():
+            query = build_query(branch_name)
+            urls = search_naver_web(query, max_results=MAX_RESULTS_PER_BRANCH)
+            texts = executor.map(fetch_text_politely, urls) if urls else None
+            jobs.append((branch_code, branch_name, query, urls, texts))
+
+        # 2) 결과는 지점/URL 순서대로 받아서 필터링 후 저장
+        for branch_code, branch_name, query, urls, texts in jobs:
+            print(f"\n[BRANCH] {branch_code} ({branch_name})")
+            print(f"  [QUERY] {query}")
+
+            if not urls:
+                print("  [INFO] 검색 결과 없음 또는 필터링됨.")
+                continue
 
-    for branch_code, branch_name in MEGABOX_DOLBY_BRANCHES.items():
-        query = build_query(branch_name)
-        print(f"\n[BRANCH] {branch_code} ({branch_name})")
-        print(f"  [QUERY] {query}")
-
-        urls = search_naver_web(query, max_results=MAX_RESULTS_PER_BRANCH)
-        if not urls:
-            print("  [INFO] 검색 결과 없음 또는 필터링됨.")
-            continue
+            print(f"  [INFO] {len(urls)}개 URL 수집됨.")
 
-        print(f"  [INFO] {len(urls)}개 URL 수집됨.")
+            os.makedirs(os.path.join(REVIEW_DIR, branch_code), exist_ok=True)
 
-        saved_count = 0
+            saved_count = 0
 
-        for idx, url in enumerate(urls, start=1):
-            print(f"    [FETCH] ({idx}/{len(urls)}) {url}")
-            text = fetch_text_from_url(url)
-            if not text:
-                print("    [WARN] 내용이 비어 있음. 스킵.")
-                continue
-
-            # 페이지 안에 지점 이름 관련 패턴이 실제로 포함되어 있는지 확인
-            if not text_matches_branch(branch_code, text):
-                print(f"    [SKIP] 본문에 지점 관련 패턴이 없음. 스킵.")
-                continue
+            for idx, (url, text) in enumerate(zip(urls, texts), start=1):
+                print(f"    [FETCH] ({idx}/{len(urls)}) {url}")
+                if not text:
+                    print("    [WARN] 내용이 비어 있음. 스킵.")
+                    continue
 
-            saved_count += 1
-            save_review_text(branch_code, saved_count, text, source=url)
+                # 페이지 안에 지점 이름 관련 패턴이 실제로 포함되어 있는지 확인
+                if not text_matches_branch(branch_code, text):
+                    print(f"    [SKIP] 본문에 지점 관련 패턴이 없음. 스킵.")
+                    continue
 
-            # 너무 빠르게 요청 보내지 않기 위해 잠깐 쉬기
-            time.sleep(1.0)
+                saved_count += 1
+                save_review_text(branch_code, saved_count, text, source=url)
 
-        print(f"  [DONE] {branch_code} ({branch_name}) => 저장된 문서: {saved_count}개")
+            print(f"  [DONE] {branch_code} ({branch_name}) => 저장된 문서: {saved_count}개")
 
     print("\n[ALL DONE] 네이버 자동 검색 + 크롤링 완료. 이제 seat_popularity.py를 실행해보세요.")
 
@@ -1,11 +1,16 @@
 # analysis/fetch_reviews_from_urls.py
 
 import os
-import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 
-import requests
-from bs4 import BeautifulSoup
+# 어디서 실행하든(프로젝트 루트, python -m analysis.xxx) 같은 폴더의 모듈을 import 할 수 있도록
+_ANALYSIS_DIR = os.path.dirname(os.path.abspath(__file__))
+if _ANALYSIS_DIR not in sys.path:
+    sys.path.insert(0, _ANALYSIS_DIR)
+
+from http_fetch import fetch_text_from_url, host_semaphore, wait_for_host_slot  # noqa: E402
 
 # --- DOLBY 8개 지점 고정 상수 ---
 MEGABOX_DOLBY_BRANCHES: Dict[str, str] = {
@@ -24,14 +29,8 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 URL_DIR = os.path.join(BASE_DIR, "data", "urls")
 REVIEW_DIR = os.path.join(BASE_DIR, "data", "seat_reviews")
 
-# 간단한 User-Agent (크롤링 매너용)
-DEFAULT_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    )
-}
+# 동시에 진행할 최대 요청 수
+MAX_WORKERS = 16
 
 
 def load_urls_for_branch(branch_code: str) -> List[str]:
@@ -58,45 +57,24 @@ def load_urls_for_branch(branch_code: str) -> List[str]:
     return urls
 
 
-def fetch_text_from_url(url: str, timeout: int = 10) -> str:
+def fetch_text_politely(url: str) -> str:
     """
-    주어진 URL에서 HTML을 가져와서, 텍스트만 추출해서 반환합니다.
-    - script, style, noscript 태그는 제거합니다.
-    - 줄바꿈을 기준으로 어느 정도 읽기 좋게 만듭니다.
+    호스트별 동시 요청 수를 제한한 상태로 fetch_text_from_url을 호출합니다.
+    다른 호스트 요청은 그동안 병렬로 진행됩니다.
     """
-    try:
-        resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=timeout)
-        resp.raise_for_status()
-    except Exception as e:
-        print(f"[ERROR] 요청 실패: {url} ({e})")
-        return ""
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # script, style, noscript 제거
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-
-    text = soup.get_text("\n")
-
-    # 빈 줄/공백 정리
-    lines = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        lines.append(line)
-
-    cleaned = "\n".join(lines)
-    return cleaned
+    with host_semaphore(url):
+        # 너무 빠르게 요청 보내지 않도록 호스트별로 간격 두기 (매너)
+        wait_for_host_slot(url)
+        text = fetch_text_from_url(url)
+    return text
 
 
 def save_review_text(branch_code: str, idx: int, text: str) -> None:
     """
     지점별 seat_reviews/{branch_code}/auto_{idx}.txt 파일로 저장합니다.
+    (지점 디렉토리는 main에서 지점마다 한 번만 만들어 둡니다.)
     """
     branch_dir = os.path.join(REVIEW_DIR, branch_code)
-    os.makedirs(branch_dir, exist_ok=True)
 
     filename = f"auto_{idx:03d}.txt"
     path = os.path.join(branch_dir, filename)
@@ -114,25 +92,31 @@ def main():
 
     os.makedirs(REVIEW_DIR, exist_ok=True)
 
-    for branch_code, branch_name in MEGABOX_DOLBY_BRANCHES.items():
-        print(f"\n[BRANCH] {branch_code} ({branch_name})")
-        urls = load_urls_for_branch(branch_code)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # 1) 모든 지점의 URL을 한 번에 작업 큐에 올려서 네트워크 대기를 겹치게 함
+        jobs = []
+        for branch_code, branch_name in MEGABOX_DOLBY_BRANCHES.items():
+            urls = load_urls_for_branch(branch_code)
+            texts = executor.map(fetch_text_politely, urls) if urls else None
+            jobs.append((branch_code, branch_name, urls, texts))
 
-        if not urls:
-            print(f"[INFO] {branch_code}용 URL이 없습니다. 건너뜁니다.")
-            continue
+        # 2) 결과는 지점/URL 순서대로 받아서 저장
+        for branch_code, branch_name, urls, texts in jobs:
+            print(f"\n[BRANCH] {branch_code} ({branch_name})")
 
-        for idx, url in enumerate(urls, start=1):
-            print(f"  [FETCH] ({idx}/{len(urls)}) {url}")
-            text = fetch_text_from_url(url)
-            if not text:
-                print("  [WARN] 내용이 비어 있습니다. 스킵합니다.")
+            if not urls:
+                print(f"[INFO] {branch_code}용 URL이 없습니다. 건너뜁니다.")
                 continue
 
-            save_review_text(branch_code, idx, text)
+            os.makedirs(os.path.join(REVIEW_DIR, branch_code), exist_ok=True)
+
+            for idx, (url, text) in enumerate(zip(urls, texts), start=1):
+                print(f"  [FETCH] ({idx}/{len(urls)}) {url}")
+                if not text:
+                    print("  [WARN] 내용이 비어 있습니다. 스킵합니다.")
+                    continue
 
-            # 너무 빠르게 요청 보내지 않도록 살짝 쉬어주기 (매너)
-            time.sleep(1.0)
+                save_review_text(branch_code, idx, text)
 
     print("\n[DONE] 모든 URL 처리 완료.")
 
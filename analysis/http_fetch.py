@@ -0,0 +1,107 @@
+# analysis/http_fetch.py
+# 리뷰 수집 스크립트들이 함께 쓰는 HTTP 세션 / 호스트별 요청 제한 / 본문 텍스트 추출
+
+import re
+import time
+import threading
+import urllib.parse
+from typing import Dict
+
+import requests
+from lxml import etree, html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 간단한 User-Agent (크롤링 매너용)
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+# 모든 요청이 공유하는 세션 (호스트별 keep-alive 커넥션 재사용)
+SESSION = requests.Session()
+SESSION.headers.update(DEFAULT_HEADERS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+# 같은 호스트에 동시에 보낼 최대 요청 수
+MAX_REQUESTS_PER_HOST = 4
+
+# 같은 호스트로 보내는 요청 사이의 최소 간격(초)
+MIN_INTERVAL_PER_HOST_SEC = 1.0
+
+_HOST_LOCK = threading.Lock()
+_HOST_SEMAPHORES: Dict[str, threading.BoundedSemaphore] = {}
+_HOST_NEXT_SLOT: Dict[str, float] = {}
+
+# 줄바꿈(str.splitlines 기준) 한 개 이상과 그 주변 공백을 통째로 매칭
+_LINE_BREAK_RE = re.compile(r"\s*[\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]\s*")
+
+
+def fetch_text_from_url(url: str, timeout: int = 10) -> str:
+    """
+    주어진 URL에서 HTML을 가져와서, 텍스트만 추출해서 반환합니다.
+    - script, style, noscript 태그는 제거합니다.
+    - 줄바꿈을 기준으로 어느 정도 읽기 좋게 만듭니다.
+    """
+    try:
+        resp = SESSION.get(url, timeout=timeout)
+        resp.raise_for_status()
+    except Exception as e:
+        print(f"[ERROR] 요청 실패: {url} ({e})")
+        return ""
+
+    # 응답 헤더에 charset이 없으면 본문 기준으로 인코딩 추정 (lxml 기본값은 latin-1)
+    if "charset" not in resp.headers.get("Content-Type", "").lower():
+        resp.encoding = resp.apparent_encoding
+
+    # BeautifulSoup 트리 없이 lxml로 바로 파싱
+    parser = lxml_html.HTMLParser(encoding=resp.encoding)
+    try:
+        tree = lxml_html.document_fromstring(resp.content, parser=parser)
+    except (etree.ParserError, ValueError):
+        return ""
+
+    # script, style, noscript, 주석 제거
+    etree.strip_elements(tree, etree.Comment, "script", "style", "noscript", with_tail=False)
+
+    text = "\n".join(tree.itertext())
+
+    # 빈 줄/공백 정리 (줄 앞뒤 공백 제거 + 빈 줄 제거를 정규식 한 번으로 처리)
+    cleaned = _LINE_BREAK_RE.sub("\n", text).strip()
+    return cleaned
+
+
+def host_semaphore(url: str) -> threading.BoundedSemaphore:
+    """
+    URL의 호스트별 세마포어를 반환합니다. (같은 호스트에 몰아서 요청하지 않기 위함)
+    """
+    host = urllib.parse.urlparse(url).netloc.lower()
+    with _HOST_LOCK:
+        sem = _HOST_SEMAPHORES.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+            _HOST_SEMAPHORES[host] = sem
+    return sem
+
+
+def wait_for_host_slot(url: str) -> None:
+    """
+    같은 호스트에는 MIN_INTERVAL_PER_HOST_SEC 간격으로만 요청이 나가도록 대기합니다.
+    다른 호스트 요청은 서로 기다리지 않습니다.
+    """
+    host = urllib.parse.urlparse(url).netloc.lower()
+    with _HOST_LOCK:
+        now = time.monotonic()
+        slot = max(now, _HOST_NEXT_SLOT.get(host, 0.0))
+        _HOST_NEXT_SLOT[host] = slot + MIN_INTERVAL_PER_HOST_SEC
+    if slot > now:
+        time.sleep(slot - now)
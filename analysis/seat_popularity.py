@@ -2,9 +2,13 @@
 
 import os
 import re
-import json
+import hashlib
 from collections import Counter
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import orjson
 
 # --- DOLBY 8개 지점 고정 상수 ---
 MEGABOX_DOLBY_BRANCHES: Dict[str, str] = {
@@ -35,30 +39,59 @@ BRANCH_SEAT_LAYOUT: Dict[str, Dict[str, object]] = {
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 DATA_DIR = os.path.join(BASE_DIR, "data", "seat_reviews")
 
+# 리뷰 파일 동시 읽기 스레드 수
+READ_WORKERS = 16
+
 # --- 좌석/열 패턴 정규식들 ---
 
+
+def _seat_re(pattern: str) -> "re.Pattern[str]":
+    """
+    좌석 패턴 컴파일.
+    - 대소문자는 IGNORECASE로 처리 (본문 전체를 upper()로 복사하지 않음)
+    - 모든 패턴이 알파벳 한 글자로 시작하므로 앞에 (?=[A-Z])를 걸어둔다
+      (re 엔진이 후보 위치만 빠르게 건너뛰며 찾음 → 한글 본문 구간은 거의 공짜, 매칭 결과는 동일)
+    """
+    return re.compile(r"(?=[A-Z])" + pattern, re.IGNORECASE)
+
+
 # E10, F8, C12 ...
-PATTERN_SIMPLE = re.compile(r"\b([A-Z])[ ]?([0-9]{1,2})\b")
+PATTERN_SIMPLE = _seat_re(r"\b([A-Z])[ ]?([0-9]{1,2})\b")
 
 # E열 10번, F열 8번 ...
-PATTERN_KOR = re.compile(r"\b([A-Z])\s*열\s*([0-9]{1,2})\s*번?")
+PATTERN_KOR = _seat_re(r"\b([A-Z])\s*열\s*([0-9]{1,2})\s*번?")
 
 # E열 10-12, F열 8~10 ...
-PATTERN_RANGE = re.compile(r"\b([A-Z])\s*열\s*([0-9]{1,2})\s*[-~]\s*([0-9]{1,2})")
+PATTERN_RANGE = _seat_re(r"\b([A-Z])\s*열\s*([0-9]{1,2})\s*[-~]\s*([0-9]{1,2})")
 
 # G,H,I,J열의 11번부터 19번 좌석
-PATTERN_ROW_LIST_NUM_RANGE = re.compile(
-    r"\b([A-Z](?:,[A-Z]){1,})\s*열의\s*([0-9]{1,2})번부터\s*([0-9]{1,2})번"
-)
+PATTERN_ROW_LIST_NUM_RANGE = _seat_re(r"\b([A-Z](?:,[A-Z]){1,})\s*열의\s*([0-9]{1,2})번부터\s*([0-9]{1,2})번")
 
 # F~K열 (알파벳 범위)
-PATTERN_ROW_ALPHA_RANGE = re.compile(r"\b([A-Z])\s*[~\-]\s*([A-Z])\s*열")
+PATTERN_ROW_ALPHA_RANGE = _seat_re(r"\b([A-Z])\s*[~\-]\s*([A-Z])\s*열")
 
 # H I열 / H, I열 (두 개 정도를 같이 말하는 표현)
-PATTERN_ROW_PAIR = re.compile(r"\b([A-Z])\s*[ ,/]\s*([A-Z])\s*열")
+PATTERN_ROW_PAIR = _seat_re(r"\b([A-Z])\s*[ ,/]\s*([A-Z])\s*열")
 
 # G열 처럼 열만 말한 경우
-PATTERN_ROW_ONLY = re.compile(r"\b([A-Z])\s*열\b")
+PATTERN_ROW_ONLY = _seat_re(r"\b([A-Z])\s*열\b")
+
+# 좌석 사이드카(.json)가 어떤 정규식으로 만들어졌는지 구분하는 값
+# (정규식이 바뀌면 예전 사이드카는 무시하고 본문을 다시 분석)
+SEAT_PATTERN_ID = hashlib.sha1(
+    "\n".join(
+        p.pattern
+        for p in (
+            PATTERN_ROW_LIST_NUM_RANGE,
+            PATTERN_ROW_ALPHA_RANGE,
+            PATTERN_ROW_PAIR,
+            PATTERN_ROW_ONLY,
+            PATTERN_RANGE,
+            PATTERN_KOR,
+            PATTERN_SIMPLE,
+        )
+    ).encode("utf-8")
+).hexdigest()[:12]
 
 
 def extract_seat_mentions(text: str) -> List[str]:
@@ -67,106 +100,132 @@ def extract_seat_mentions(text: str) -> List[str]:
     열만 언급된 경우에는 해당 열의 임의 좌석(예: 1번)로 치환해서
     '행 인기'와 '존 인기'에 반영되도록 한다.
     """
-    # 대소문자 섞여 있을 수 있으니 미리 대문자로 변환해서 처리
-    text_up = text.upper()
+    # 대소문자는 정규식(IGNORECASE)에서 처리하고, 캡처한 열 문자만 대문자로 맞춘다
     seats: List[str] = []
 
     # 0) G,H,I,J열의 11번부터 19번 좌석
-    for rows_str, start, end in PATTERN_ROW_LIST_NUM_RANGE.findall(text_up):
-        try:
-            s = int(start)
-            e = int(end)
-        except ValueError:
-            continue
+    for rows_str, start, end in PATTERN_ROW_LIST_NUM_RANGE.findall(text):
+        s, e = int(start), int(end)
         if s > e:
             s, e = e, s
-        rows = [r.strip() for r in rows_str.split(",") if r.strip()]
-        for row in rows:
+        for row in rows_str.upper().split(","):
             for num in range(s, e + 1):
                 seats.append(f"{row}{num}")
 
     # 1) F~K열 같은 알파벳 범위 → 각 열에 대해 대표 좌석(1번)으로 환산
-    for start_row, end_row in PATTERN_ROW_ALPHA_RANGE.findall(text_up):
-        s_ord = ord(start_row)
-        e_ord = ord(end_row)
+    for start_row, end_row in PATTERN_ROW_ALPHA_RANGE.findall(text):
+        s_ord, e_ord = ord(start_row.upper()), ord(end_row.upper())
         if s_ord > e_ord:
             s_ord, e_ord = e_ord, s_ord
         for code in range(s_ord, e_ord + 1):
-            r = chr(code)
-            seats.append(f"{r}1")
+            seats.append(f"{chr(code)}1")
 
     # 2) H I열 / H, I열 같은 2개 열 언급 → 각 열에 대해 대표 좌석(1번)
-    for r1, r2 in PATTERN_ROW_PAIR.findall(text_up):
-        seats.append(f"{r1}1")
-        seats.append(f"{r2}1")
+    for r1, r2 in PATTERN_ROW_PAIR.findall(text):
+        seats.append(f"{r1.upper()}1")
+        seats.append(f"{r2.upper()}1")
 
     # 3) G열 처럼 열만 말한 경우 → 해당 열의 대표 좌석(1번)
-    for row in PATTERN_ROW_ONLY.findall(text_up):
-        seats.append(f"{row}1")
+    for row in PATTERN_ROW_ONLY.findall(text):
+        seats.append(f"{row.upper()}1")
 
     # 4) E열 8~12, F열 10-12 같은 범위 표현 (열 하나 + 번호 범위)
-    for row, start, end in PATTERN_RANGE.findall(text_up):
-        try:
-            s = int(start)
-            e = int(end)
-        except ValueError:
-            continue
+    for row, start, end in PATTERN_RANGE.findall(text):
+        row = row.upper()
+        s, e = int(start), int(end)
         if s > e:
             s, e = e, s
         for num in range(s, e + 1):
             seats.append(f"{row}{num}")
 
     # 5) E열 10번, F열 8번 ...
-    for row, num in PATTERN_KOR.findall(text_up):
-        try:
-            n = int(num)
-        except ValueError:
-            continue
-        seats.append(f"{row}{n}")
+    for row, num in PATTERN_KOR.findall(text):
+        seats.append(f"{row.upper()}{int(num)}")
 
     # 6) E10, F8, C12 ...
-    for row, num in PATTERN_SIMPLE.findall(text_up):
-        try:
-            n = int(num)
-        except ValueError:
-            continue
-        seats.append(f"{row}{n}")
+    for row, num in PATTERN_SIMPLE.findall(text):
+        seats.append(f"{row.upper()}{int(num)}")
 
     return seats
 
 
-def is_valid_seat(branch_code: str, seat: str) -> bool:
+@lru_cache(maxsize=None)
+def _valid_seat_set(branch_code: str) -> Optional[FrozenSet[str]]:
     """
-    해당 지점(branch_code)에 실제 존재 가능한 좌석인지 검사.
-    seat 예시: 'E10', 'Q1'
+    해당 지점(branch_code)에 실제 존재 가능한 좌석 문자열 집합('A1' ~ 'M24' 등).
+    레이아웃 정보가 없으면 None (모두 허용).
     """
     layout = BRANCH_SEAT_LAYOUT.get(branch_code)
     if layout is None:
-        # 레이아웃 정보 없으면 일단 모두 허용
-        return True
+        return None
 
-    if not seat:
-        return False
+    max_row = str(layout["max_row"]).upper()
+    max_seat = int(layout["max_seat"])
 
-    row = seat[0].upper()
-    num_part = seat[1:]
+    rows = [chr(code) for code in range(ord("A"), ord(max_row) + 1)]
+    return frozenset(f"{r}{n}" for r in rows for n in range(1, max_seat + 1))
 
-    try:
-        num = int(num_part)
-    except ValueError:
-        return False
 
-    max_row = str(layout["max_row"]).upper()
-    max_seat = int(layout["max_seat"])
+def seat_sidecar_path(txt_path: str) -> str:
+    """
+    리뷰 텍스트 파일 옆에 두는 좌석 추출 결과 파일 경로 ('xxx.txt' -> 'xxx.json').
+    """
+    return os.path.splitext(txt_path)[0] + ".json"
 
-    # 'A' <= row <= max_row
-    if not ("A" <= row <= max_row):
-        return False
 
-    if not (1 <= num <= max_seat):
-        return False
+def build_seat_sidecar(content: str, source: str) -> Dict[str, object]:
+    """
+    저장할 리뷰 파일 내용(content) 전체에서 좌석을 미리 뽑아 사이드카로 저장할 dict를 만든다.
+    """
+    return {
+        "url": source,
+        "pattern_id": SEAT_PATTERN_ID,
+        "seats": extract_seat_mentions(content),
+    }
 
-    return True
+
+def _read_sidecar_seats(sidecar_path: str, txt_mtime: float) -> Optional[List[str]]:
+    """
+    사이드카에 저장된 좌석 목록을 읽는다.
+    텍스트 파일보다 오래됐거나 다른 정규식으로 만든 사이드카면 None.
+    """
+    try:
+        if os.path.getmtime(sidecar_path) < txt_mtime:
+            return None
+        with open(sidecar_path, "rb") as f:
+            data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+    if data.get("pattern_id") != SEAT_PATTERN_ID:
+        return None
+    seats = data.get("seats")
+    return seats if isinstance(seats, list) else None
+
+
+def _read_text(path: str) -> Optional[str]:
+    # 바이너리로 한 번에 읽고 한 번만 디코딩 (텍스트 모드의 줄바꿈 변환/버퍼 복사 생략)
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        print(f"[WARN] 인코딩 문제로 스킵: {path}")
+        return None
+
+
+def _load_review(entry: Tuple[str, float, Optional[str]]) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    리뷰 파일 하나를 불러온다. entry = (텍스트 경로, 수정 시각, 사이드카 경로 또는 None)
+    유효한 사이드카가 있으면 (좌석 목록, ""), 없으면 (None, 본문 텍스트).
+    UTF-8로 읽을 수 없는 파일은 (None, None).
+    """
+    path, mtime, sidecar_path = entry
+    if sidecar_path is not None:
+        seats = _read_sidecar_seats(sidecar_path, mtime)
+        if seats is not None:
+            return seats, ""
+    return None, _read_text(path)
 
 
 def analyze_branch(branch_code: str) -> Counter:
@@ -175,31 +234,50 @@ def analyze_branch(branch_code: str) -> Counter:
     지점별 좌석 레이아웃(BRANCH_SEAT_LAYOUT)에 맞지 않는 좌석은 버린다.
     """
     branch_dir = os.path.join(DATA_DIR, branch_code)
-    seat_counter: Counter = Counter()
 
     if not os.path.isdir(branch_dir):
         print(f"[WARN] 지점 {branch_code} 디렉토리가 없습니다: {branch_dir}")
-        return seat_counter
-
-    for filename in os.listdir(branch_dir):
-        if not filename.endswith(".txt"):
+        return Counter()
+
+    valid_set = _valid_seat_set(branch_code)
+    # 파일마다 Counter.update 하지 않고 모아뒀다가 마지막에 한 번에 센다
+    all_seats: List[str] = []
+
+    with os.scandir(branch_dir) as it:
+        files = [e for e in it if e.is_file()]
+    json_paths = {e.path for e in files if e.name.endswith(".json")}
+    # 경로/사이드카 존재 여부는 파일 목록을 볼 때 한 번만 계산해 둔다
+    entries = []
+    for e in files:
+        if not e.name.endswith(".txt"):
             continue
-        path = os.path.join(branch_dir, filename)
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                text = f.read()
-        except UnicodeDecodeError:
-            print(f"[WARN] 인코딩 문제로 스킵: {path}")
+        sidecar_path = seat_sidecar_path(e.path)
+        if sidecar_path not in json_paths:
+            sidecar_path = None
+        entries.append((e.path, e.stat().st_mtime, sidecar_path))
+
+    # 파일 읽기는 I/O 대기 위주라 스레드로 겹쳐서 읽는다
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        loaded = list(executor.map(_load_review, entries))
+
+    for cached_seats, text in loaded:
+        # 수집할 때 미리 뽑아둔 좌석이 있으면 본문을 다시 훑지 않는다
+        if cached_seats is not None:
+            raw_seats = cached_seats
+        elif text is None:
+            # 인코딩 문제로 읽지 못한 파일 (경고는 _read_text에서 출력)
             continue
-
-        raw_seats = extract_seat_mentions(text)
+        else:
+            raw_seats = extract_seat_mentions(text)
 
         # 지점별 유효 좌석만 필터링
-        seats = [s for s in raw_seats if is_valid_seat(branch_code, s)]
-
-        seat_counter.update(seats)
+        if valid_set is None:
+            # 레이아웃 정보 없으면 일단 모두 허용
+            all_seats.extend(raw_seats)
+        else:
+            all_seats.extend(s for s in raw_seats if s in valid_set)
 
-    return seat_counter
+    return Counter(all_seats)
 
 
 def build_zone_summary(seat_counter: Counter) -> Dict[str, float]:
@@ -207,32 +285,34 @@ def build_zone_summary(seat_counter: Counter) -> Dict[str, float]:
     좌석 단위 Counter를 바탕으로 열(행) 구간별 비율 요약.
     A-B, C-D, E-F, G-H, I-J, K-L, M-N, O-P, Q-R 이렇게 2열씩 묶어서 본다.
     """
-    total = sum(seat_counter.values()) or 1
+    # 2열 단위 구간 정의 (인덱스 = (행 - 'A') // 2)
+    zone_labels = [
+        "A-B열",
+        "C-D열",
+        "E-F열",
+        "G-H열",
+        "I-J열",
+        "K-L열",
+        "M-N열",
+        "O-P열",
+        "Q-R열",
+    ]
 
-    row_counter: Counter = Counter()
+    # 좌석 Counter를 한 번만 훑으면서 구간별 합계와 전체 합계를 같이 구한다
+    zone_totals = [0] * len(zone_labels)
+    total = 0
     for seat, cnt in seat_counter.items():
+        total += cnt
         if not seat:
             continue
-        row = seat[0].upper()  # 'E10' -> 'E'
-        row_counter[row] += cnt
-
-    # 2열 단위 구간 정의
-    zone_groups = [
-        ("A-B열", {"A", "B"}),
-        ("C-D열", {"C", "D"}),
-        ("E-F열", {"E", "F"}),
-        ("G-H열", {"G", "H"}),
-        ("I-J열", {"I", "J"}),
-        ("K-L열", {"K", "L"}),
-        ("M-N열", {"M", "N"}),
-        ("O-P열", {"O", "P"}),
-        ("Q-R열", {"Q", "R"}),
-    ]
+        idx = (ord(seat[0].upper()) - ord("A")) // 2  # 'E10' -> 'E' -> 2
+        if 0 <= idx < len(zone_totals):
+            zone_totals[idx] += cnt
 
-    zones: Dict[str, float] = {}
-    for label, rows in zone_groups:
-        score = sum(cnt for r, cnt in row_counter.items() if r in rows) / total
-        zones[label] = score
+    total = total or 1
+    zones: Dict[str, float] = {
+        label: zone_totals[i] / total for i, label in enumerate(zone_labels)
+    }
 
     return zones
 
@@ -269,8 +349,9 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, "seat_popularity.json")
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    # orjson은 UTF-8 바이트로 바로 인코딩 (한글 이스케이프 없음)
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
 
     print(f"[DONE] 결과 저장: {output_path}")
 
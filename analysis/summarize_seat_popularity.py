@@ -1,9 +1,10 @@
 # analysis/summarize_seat_popularity.py
 
 import os
-import json
 from typing import Dict, List
 
+import orjson
+
 MEGABOX_DOLBY_BRANCHES: Dict[str, str] = {
     "0019": "남양주현대아울렛스페이스원",
     "7011": "대구신세계(동대구)",
@@ -20,8 +21,8 @@ DATA_PATH = os.path.join(BASE_DIR, "data", "seat_popularity.json")
 
 
 def load_data() -> Dict[str, dict]:
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(DATA_PATH, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def make_zone_summary(zones: List[Dict[str, object]]) -> str:
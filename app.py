@@ -1,4 +1,5 @@
-import os, sys
+import os, re, sys, threading, time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 sys.path.append(os.path.dirname(__file__))
 
 from flask import (
@@ -8,21 +9,29 @@ from flask import (
     redirect,
     url_for,
     flash,
-    jsonify,
+    session,
 )
-from models import db, MovieOpenAlert, SeatCancelAlert, User
+from models import db, MovieOpenAlert, SeatCancelAlert, User, utc_now
+from flask_caching import Cache
+from jinja2 import FileSystemBytecodeCache
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+from sqlalchemy import case, event, func, select, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import joinedload, raiseload
 
 from catalog import CATALOG, MOVIES
-from email_utils import send_email
-from datetime import datetime
+from email_utils import init_email, send_email, send_email_parallel
+import email_worker
+from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 from crawlers import megabox  # 메가박스 DOLBY 상영정보 크롤링용
-import json
+import orjson
 
 app = Flask(__name__)
 
-# --- 메가박스 DOLBY 지점 코드 -> 지점명 매핑 ---
-BRANCH_CODE_TO_NAME = {
+# --- 메가박스 DOLBY 지점 코드 -> 지점명 매핑 (읽기 전용) ---
+BRANCH_CODE_TO_NAME = MappingProxyType({
     "0019": "메가박스 남양주현대아울렛스페이스원",
     "7011": "메가박스 대구신세계(동대구)",
     "0028": "메가박스 대전신세계아트앤사이언스",
@@ -31,7 +40,17 @@ BRANCH_CODE_TO_NAME = {
     "0020": "메가박스 안성스타필드",
     "1351": "메가박스 코엑스",
     "4651": "메가박스 하남스타필드",
-}
+})
+
+
+DOLBY_CODES = frozenset(BRANCH_CODE_TO_NAME)
+
+
+@lru_cache(maxsize=None)
+def _resolve_theater(code: str) -> str:
+    """지점 코드 -> 지점명 (매핑에 없으면 코드 그대로)."""
+    return BRANCH_CODE_TO_NAME.get(code, code)
+
 
 # 세션/플래시
 app.config["SECRET_KEY"] = "dev-secret"
@@ -41,21 +60,67 @@ BASEDIR = os.path.abspath(os.path.dirname(__file__))
 DB_PATH = os.path.join(BASEDIR, "catchseat.db")
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + DB_PATH
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# 커넥션 풀 크기를 명시 (요청 스레드 + 메일 워커 스레드가 커넥션을 재사용하도록)
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_size": 6,
+    "max_overflow": 10,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+    "connect_args": {"check_same_thread": False},
+}
 db.init_app(app)
 
+# --- 템플릿 바이트코드 캐시 (워커/재시작마다 템플릿을 다시 컴파일하지 않도록 디스크에 저장) ---
+JINJA_CACHE_DIR = os.path.join(BASEDIR, ".jinja_cache")
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=JINJA_CACHE_DIR)
+
+# 디버그 모드가 아니면 템플릿 파일 변경 감시(매 렌더마다 stat)를 끄고, 첫 요청 전에 미리 컴파일
+if not app.debug:
+    app.config["TEMPLATES_AUTO_RELOAD"] = False
+    app.jinja_env.auto_reload = False
+    for _template_name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(_template_name)
+
+
+def _set_sqlite_pragma(dbapi_conn, _connection_record):
+    # WAL: run-checks가 쓰는 동안에도 /me 등 읽기 요청이 막히지 않도록
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA cache_size=-20000")  # 약 20MB
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA mmap_size=268435456")  # 256MB, 읽기는 페이지 캐시를 바로 매핑
+    cur.close()
+
+
+# 새 SQLite 커넥션마다 PRAGMA 적용 (첫 커넥션보다 먼저 등록해야 함)
+with app.app_context():
+    event.listen(db.engine, "connect", _set_sqlite_pragma)
+
+# --- 캐시 (프로세스 메모리) ---
+cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
+
 # --- 인기 좌석 구역 요약 데이터 로드 ---
 ZONE_PATH = os.path.join(BASEDIR, "data", "seat_zone_summary.json")
+NO_ZONE_SUMMARY = "인기 구역 데이터가 없습니다."
 try:
-    with open(ZONE_PATH, encoding="utf-8") as f:
-        ZONE_SUMMARY = json.load(f)
+    with open(ZONE_PATH, "rb") as f:
+        ZONE_SUMMARY = orjson.loads(f.read())
 except FileNotFoundError:
     ZONE_SUMMARY = {}
 
+# 지점 코드 -> 요약 문구만 뽑아서 평평하게 (조회 시 dict 한 번만 찾도록)
+ZONE_STRINGS = {
+    code: entry["zone_summary"]
+    for code, entry in ZONE_SUMMARY.items()
+    if entry and "zone_summary" in entry
+}
+
 
 def get_zone_summary(branch_code: str) -> str:
     """브랜치 코드 기준으로 인기 좌석 구역 요약 문구를 반환."""
-    entry = ZONE_SUMMARY.get(branch_code)
-    return entry["zone_summary"] if entry and "zone_summary" in entry else "인기 구역 데이터가 없습니다."
+    return ZONE_STRINGS.get(branch_code, NO_ZONE_SUMMARY)
 
 
 # --- 돌비시네마 상영관 기본 정보 (좌석 수/열 범위/좌석 번호/특징) ---
@@ -114,9 +179,69 @@ DOLBY_THEATER_INFO = {
     },
 }
 
-# Flask: app context에서 테이블 생성
-with app.app_context():
+
+def _theater_view(code: str, name: str) -> dict:
+    info = DOLBY_THEATER_INFO.get(code, {})
+    return {
+        "code": code,
+        "name": name,
+        "seats": info.get("seats"),
+        "row_range": info.get("row_range"),
+        "number_range": info.get("number_range"),
+        "feature": info.get("feature"),
+        "zone_summary": get_zone_summary(code),
+    }
+
+
+# 소개 페이지용 지점 목록 (상수 데이터라 import 시 한 번만 만들어 둠, 지점명 순)
+DOLBY_THEATERS_VIEW = tuple(
+    sorted(
+        (_theater_view(code, name) for code, name in BRANCH_CODE_TO_NAME.items()),
+        key=lambda t: t["name"],
+    )
+)
+
+
+DEBUG_LOG = bool(os.environ.get("CATCHSEAT_DEBUG"))
+
+
+def init_db() -> None:
+    """테이블 + (기존 테이블에 없는) 인덱스 생성."""
     db.create_all()
+    # create_all은 이미 있는 테이블에 새로 추가된 인덱스는 만들지 않으므로 따로 보강
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=db.engine, checkfirst=True)
+            except OperationalError as e:
+                # 예전 스키마라 컬럼이 없는 경우 등은 건너뜀
+                print(f"[DB] 인덱스 생성 건너뜀: {index.name} ({e.orig})")
+
+    # movie_open_alerts.date 가 문자열("YYYYMMDD")에서 DATE로 바뀜
+    # → 예전 행을 SQLAlchemy Date가 읽는 "YYYY-MM-DD" 형식으로 변환
+    db.session.execute(text(
+        "UPDATE movie_open_alerts"
+        " SET date = substr(date, 1, 4) || '-' || substr(date, 5, 2) || '-' || substr(date, 7, 2)"
+        " WHERE length(date) = 8"
+    ))
+    db.session.commit()
+
+
+@app.cli.command("init-db")
+def init_db_command():
+    """flask --app app init-db : 스키마/인덱스 생성 (모델이 바뀌었을 때 한 번 실행)"""
+    with app.app_context():
+        init_db()
+    print("DB 초기화 완료:", DB_PATH)
+
+
+# DB 파일이 아직 없을 때(처음 실행)만 import 시점에 테이블 생성
+# (워커 프로세스마다 매번 DDL 확인을 하지 않도록, 이후 스키마 변경은 init-db로 반영)
+if not os.path.exists(DB_PATH):
+    with app.app_context():
+        init_db()
+
+if DEBUG_LOG:
     print("DB 경로:", DB_PATH)
     print("DB 존재?", os.path.exists(DB_PATH))
 
@@ -127,15 +252,49 @@ app.config["SMTP_USER"] = os.environ.get("CATCHSEAT_SMTP_USER")
 app.config["SMTP_PASSWORD"] = os.environ.get("CATCHSEAT_SMTP_PASSWORD")
 app.config["SMTP_USE_TLS"] = os.environ.get("CATCHSEAT_SMTP_USE_TLS", "true").lower() == "true"
 app.config["SMTP_DEFAULT_SENDER"] = os.environ.get("CATCHSEAT_SMTP_DEFAULT_SENDER")
+# 동시에 열 SMTP 연결 수 (메일 서비스의 동시 접속 제한에 맞춰 조정)
+app.config["SMTP_MAX_CONNECTIONS"] = int(os.environ.get("CATCHSEAT_SMTP_MAX_CONNECTIONS", 4))
+init_email(app)
 
 # ★ LoginManager 설정
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 
 
+# 로그인 유저 캐시: 인증된 요청마다 users SELECT가 나가지 않도록 잠깐 보관
+USER_CACHE_TTL_SEC = 30
+USER_CACHE_MAX = 1024
+_user_cache = {}  # user_id -> (만료 시각, User)
+_user_cache_lock = threading.Lock()
+
+
+def _forget_user(user_id: int) -> None:
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
 @login_manager.user_loader
 def load_user(user_id: str):
-    return User.query.get(int(user_id))
+    uid = int(user_id)
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(uid)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    u = db.session.get(User, uid)
+    if u is None:
+        _forget_user(uid)
+        return None
+
+    # 세션에서 떼어내서, 이후 요청의 commit으로 속성이 만료(expire)되지 않게 함
+    # (current_user는 id/email 정도만 쓰므로 분리된 객체로 충분)
+    db.session.expunge(u)
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_MAX:
+            _user_cache.clear()
+        _user_cache[uid] = (now + USER_CACHE_TTL_SEC, u)
+    return u
 
 
 @app.get("/")
@@ -143,56 +302,63 @@ def index():
     return "This is catch-seat!"
 
 
+def _has_pending_flashes() -> bool:
+    # 플래시 메시지가 남아 있으면 페이지마다 내용이 달라지므로 캐시를 쓰지 않음
+    return bool(session.get("_flashes"))
+
+
 @app.get("/home")
+@cache.cached(timeout=3600, unless=_has_pending_flashes)
 def home():
     return render_template("home.html", title="홈")
 
 
 @app.get("/hw1")
+@cache.cached(timeout=3600, unless=_has_pending_flashes)
 def hw1():
     return render_template("hw1.html")
 
 
 @app.get("/select")
+@cache.cached(timeout=3600, unless=_has_pending_flashes)
 def select_service():
     return render_template("service_select.html", title="서비스 선택")
 
 
 # ---- 메가박스 돌비시네마 소개 페이지 ----
 @app.get("/theaters/dolby")
+@cache.cached(timeout=3600, unless=_has_pending_flashes)
 def dolby_theaters():
     """메가박스 돌비시네마 8개 지점 정보 + 인기 좌석 구역 안내 페이지."""
-    theaters = []
-    for code, name in BRANCH_CODE_TO_NAME.items():
-        info = DOLBY_THEATER_INFO.get(code, {})
-        theaters.append(
-            {
-                "code": code,
-                "name": name,
-                "seats": info.get("seats"),
-                "row_range": info.get("row_range"),
-                "number_range": info.get("number_range"),
-                "feature": info.get("feature"),
-                "zone_summary": get_zone_summary(code),
-            }
-        )
-    theaters.sort(key=lambda t: t["name"])
     return render_template(
         "dolby_theaters.html",
         title="메가박스 돌비시네마 안내",
-        theaters=theaters,
+        theaters=DOLBY_THEATERS_VIEW,
     )
 
 
+# "YYYY-MM-DD" (또는 "YYYYMMDD") 날짜 → "YYYYMMDD"
+_YMD_RE = re.compile(r"^(\d{4})-?(\d{2})-?(\d{2})$")
+
+
+def parse_ymd(date_str: str):
+    """날짜 문자열을 검증하고 "YYYYMMDD"로 변환 (형식이 틀리면 None)."""
+    m = _YMD_RE.match(date_str or "")
+    return "".join(m.groups()) if m else None
+
+
+def _fields(form, *names):
+    """폼에서 여러 필드를 한 번에 꺼내 strip (없으면 "")."""
+    return tuple((form.get(name) or "").strip() for name in names)
+
+
 # ---- 오픈 알림 ----
 @app.route("/alerts/open", methods=["GET", "POST"])
 @login_required
 def open_alert_form():
     if request.method == "POST":
-        movie = request.form.get("movie", "").strip()
-        theater = request.form.get("theater", "").strip()
-        screen = request.form.get("screen", "").strip()
-        date_str = request.form.get("date", "").strip()  # "YYYY-MM-DD"
+        # date: "YYYY-MM-DD"
+        movie, theater, screen, date_str = _fields(request.form, "movie", "theater", "screen", "date")
 
         if not movie or not theater:
             flash("영화와 극장은 필수입니다.", "error")
@@ -202,8 +368,12 @@ def open_alert_form():
             flash("관람 날짜를 선택해주세요.", "error")
             return redirect(url_for("open_alert_form"))
 
-        date_compact = date_str.replace("-", "")
-        if len(date_compact) != 8 or not date_compact.isdigit():
+        date_compact = parse_ymd(date_str)
+        try:
+            show_date = datetime.strptime(date_compact, "%Y%m%d").date() if date_compact else None
+        except ValueError:
+            show_date = None
+        if not show_date:
             flash("관람 날짜 형식이 올바르지 않습니다.", "error")
             return redirect(url_for("open_alert_form"))
 
@@ -212,7 +382,7 @@ def open_alert_form():
             theater=theater,
             screen=screen or None,
             user_id=current_user.id,
-            date=date_compact,
+            date=show_date,
         )
         db.session.add(alert)
         db.session.commit()
@@ -232,35 +402,41 @@ def open_alert_form():
 
 
 # ---- 좌석 취소 알림 (폼 + 검색 API) ----
+# 메가박스 좌석 상태 문자열 "잔여 N석"
+_SEATS_STATUS_RE = re.compile(r"잔여\s*(\d+)\s*석")
+
+
 def _parse_seats_status_to_int(seats_status: str) -> int:
-    if not seats_status:
-        return 0
-    seats_status = seats_status.strip()
-    if seats_status.startswith("잔여") and seats_status.endswith("석"):
-        inner = seats_status[2:-1].strip()
-        parts = inner.split()
-        if parts:
-            try:
-                return int(parts[0])
-            except ValueError:
-                return 0
-    return 0
+    m = _SEATS_STATUS_RE.search(seats_status) if seats_status else None
+    return int(m.group(1)) if m else 0
+
+
+def _find_showtime(showtimes, movie: str, screen: str, start_time: str):
+    """(영화 제목, 상영관, 시작 시간)이 일치하는 첫 상영정보. 없으면 None"""
+    return next(
+        (
+            st for st in showtimes
+            if st.movie_title == movie and st.screen_name == screen and st.start_time == start_time
+        ),
+        None,
+    )
+
+
+# 좌석 취소 알림 폼의 상영 일시 형식
+SHOW_DATETIME_FORMAT = "%Y-%m-%d %H:%M"
 
 
 @app.route("/alerts/seat", methods=["GET", "POST"])
 @login_required
 def seat_alert_form():
     if request.method == "POST":
-        brand_raw = request.form.get("brand", "").strip()
+        # theater: branch_code
+        brand_raw, movie, theater, date_str, show_dt, screen, desired_count_raw = _fields(
+            request.form,
+            "brand", "movie", "theater", "date", "show_datetime", "screen", "desired_count",
+        )
         brand = (brand_raw or "MEGABOX").upper()
 
-        movie = request.form.get("movie", "").strip()
-        theater = request.form.get("theater", "").strip()  # branch_code
-        date_str = request.form.get("date", "").strip()
-        show_dt = request.form.get("show_datetime", "").strip()
-        screen = request.form.get("screen", "").strip()
-        desired_count_raw = request.form.get("desired_count", "").strip()
-
         if not theater or not date_str:
             flash("극장과 날짜를 먼저 선택하고 상영정보를 검색해주세요.", "error")
             return redirect(url_for("seat_alert_form"))
@@ -278,38 +454,29 @@ def seat_alert_form():
             flash("원하는 좌석 수는 1 이상이어야 합니다.", "error")
             return redirect(url_for("seat_alert_form"))
 
-        date_compact = date_str.replace("-", "")
-        if len(date_compact) != 8 or not date_compact.isdigit():
+        date_compact = parse_ymd(date_str)
+        if not date_compact:
             flash("관람 날짜 형식이 올바르지 않습니다.", "error")
             return redirect(url_for("seat_alert_form"))
 
-        start_time = None
-        if len(show_dt) >= 5:
-            maybe_time = show_dt[-5:]
-            if ":" in maybe_time:
-                start_time = maybe_time
-
-        if not start_time:
+        # 폼에서는 "YYYY-MM-DD HH:MM" 형식으로 넘어옴 → DB에는 DATETIME으로 저장
+        try:
+            show_at = datetime.strptime(show_dt, SHOW_DATETIME_FORMAT)
+        except ValueError:
             flash("상영 시간 형식이 올바르지 않습니다.", "error")
             return redirect(url_for("seat_alert_form"))
+        start_time = show_at.strftime("%H:%M")
 
         try:
+            # (지점, 날짜) 캐시는 crawlers.megabox.get_showtimes 안에서 처리
             showtimes = megabox.get_showtimes(theater, date_compact)
         except Exception as e:
             print("[seat_alert_form] 메가박스 상영정보 크롤링 실패:", e)
             flash("메가박스 상영정보를 불러오는 중 오류가 발생했습니다. 다시 시도해주세요.", "error")
             return redirect(url_for("seat_alert_form"))
 
-        baseline_available = None
-        for st in showtimes:
-            if st.get("movie_title") != movie:
-                continue
-            if st.get("screen_name") != screen:
-                continue
-            if st.get("start_time") != start_time:
-                continue
-            baseline_available = _parse_seats_status_to_int(st.get("seats_status"))
-            break
+        st = _find_showtime(showtimes, movie, screen, start_time)
+        baseline_available = _parse_seats_status_to_int(st.seats_status) if st else None
 
         if baseline_available is None:
             flash("선택하신 상영 정보를 메가박스에서 찾을 수 없습니다. 다시 검색 후 선택해주세요.", "error")
@@ -321,7 +488,7 @@ def seat_alert_form():
             movie=movie,
             theater=theater,
             screen=screen or None,
-            show_datetime=show_dt,
+            show_datetime=show_at,
             desired_seats=None,
             desired_count=desired_count,
             baseline_available_seats=baseline_available,
@@ -332,7 +499,7 @@ def seat_alert_form():
 
         flash(
             f"[저장됨] 좌석 취소 알림: {brand} / {movie} / "
-            f"{BRANCH_CODE_TO_NAME.get(theater, theater)} / {show_dt} / "
+            f"{_resolve_theater(theater)} / {show_dt} / "
             f"기준 잔여 {baseline_available}석 / 원하는 {desired_count}석",
             "success",
         )
@@ -345,6 +512,11 @@ def seat_alert_form():
     )
 
 
+def ojson(obj, status: int = 200):
+    """orjson으로 직렬화한 JSON 응답."""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype="application/json")
+
+
 @app.get("/api/megabox/dolby_showtimes")
 @login_required
 def api_megabox_dolby_showtimes():
@@ -352,42 +524,63 @@ def api_megabox_dolby_showtimes():
     date_str = (request.args.get("date") or "").strip()
 
     if not theater or not date_str:
-        return jsonify({"ok": False, "error": "극장과 날짜를 모두 선택해주세요."}), 400
+        return ojson({"ok": False, "error": "극장과 날짜를 모두 선택해주세요."}, 400)
 
-    date_compact = date_str.replace("-", "")
-    if len(date_compact) != 8 or not date_compact.isdigit():
-        return jsonify({"ok": False, "error": "날짜 형식이 올바르지 않습니다."}), 400
+    date_compact = parse_ymd(date_str)
+    if not date_compact:
+        return ojson({"ok": False, "error": "날짜 형식이 올바르지 않습니다."}, 400)
 
-    if theater not in BRANCH_CODE_TO_NAME:
-        return jsonify({"ok": False, "error": "지원하지 않는 DOLBY 지점입니다."}), 400
+    if theater not in DOLBY_CODES:
+        return ojson({"ok": False, "error": "지원하지 않는 DOLBY 지점입니다."}, 400)
 
     try:
         showtimes = megabox.get_showtimes(theater, date_compact)
     except Exception as e:
         print("[api_megabox_dolby_showtimes] 크롤링 실패:", e)
-        return jsonify({"ok": False, "error": "메가박스 상영정보를 불러오는 중 오류가 발생했습니다."}), 500
-
-    return jsonify(
-        {"ok": True, "branch_code": theater, "date": date_str, "showtimes": showtimes}
+        return ojson({"ok": False, "error": "메가박스 상영정보를 불러오는 중 오류가 발생했습니다."}, 500)
+
+    return ojson(
+        {
+            "ok": True,
+            "branch_code": theater,
+            "date": date_str,
+            # 비교용 정규화 필드(title_norm / screen_norm)는 빼고 화면에 필요한 값만
+            "showtimes": [
+                {
+                    "movie_title": st.movie_title,
+                    "screen_name": st.screen_name,
+                    "start_time": st.start_time,
+                    "seats_status": st.seats_status,
+                    "bookable": st.bookable,
+                }
+                for st in showtimes
+            ],
+        }
     )
 
 
 # ---------- Auth ----------
+
+
 @app.route("/signup", methods=["GET", "POST"])
 def signup():
     if request.method == "POST":
-        email = request.form.get("email", "").strip()
-        pw = request.form.get("password", "")
+        form = request.form
+        (email,) = _fields(form, "email")
+        pw = form.get("password", "")  # 비밀번호는 공백도 그대로
         if not email or not pw:
             flash("이메일/비밀번호를 입력하세요.", "error")
             return redirect(url_for("signup"))
-        if User.query.filter_by(email=email).first():
-            flash("이미 가입된 이메일입니다.", "error")
-            return redirect(url_for("signup"))
         u = User(email=email)
         u.set_password(pw)
         db.session.add(u)
-        db.session.commit()
+        # 중복 이메일은 미리 SELECT 하지 않고 unique 제약(IntegrityError)으로 판단
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash("이미 가입된 이메일입니다.", "error")
+            return redirect(url_for("signup"))
         flash("회원가입 완료. 로그인하세요.", "success")
         return redirect(url_for("login"))
     return render_template("auth_signup.html", title="회원가입")
@@ -396,8 +589,9 @@ def signup():
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
-        email = request.form.get("email", "").strip()
-        pw = request.form.get("password", "")
+        form = request.form
+        (email,) = _fields(form, "email")
+        pw = form.get("password", "")  # 비밀번호는 공백도 그대로
         u = User.query.filter_by(email=email).first()
         if not u or not u.check_password(pw):
             flash("이메일 또는 비밀번호가 올바르지 않습니다.", "error")
@@ -412,31 +606,44 @@ def login():
 @app.get("/logout")
 @login_required
 def logout():
+    _forget_user(current_user.id)
     logout_user()
     flash("로그아웃되었습니다.", "success")
     return redirect(url_for("home"))
 
 
 # ---------- 마이페이지 ----------
+# 템플릿에서 쓰는 컬럼만 SELECT (ORM 객체 대신 dict로 넘김)
+ME_OPEN_FIELDS = ("id", "movie", "theater", "screen", "date", "created_at", "sent_at")
+ME_SEAT_FIELDS = ("id", "movie", "theater", "show_datetime", "desired_count", "created_at", "sent_at")
+
+
+def _theater_name_case(model):
+    """지점 코드 -> 지점명 변환을 SQL CASE로 (매핑에 없으면 코드 그대로)."""
+    return case(dict(BRANCH_CODE_TO_NAME), value=model.theater, else_=model.theater).label("theater_name")
+
+
+ME_OPEN_SELECT = select(
+    *(getattr(MovieOpenAlert, name) for name in ME_OPEN_FIELDS),
+    _theater_name_case(MovieOpenAlert),
+).order_by(MovieOpenAlert.id.asc())
+ME_SEAT_SELECT = select(
+    *(getattr(SeatCancelAlert, name) for name in ME_SEAT_FIELDS),
+    _theater_name_case(SeatCancelAlert),
+).order_by(SeatCancelAlert.id.asc())
+
+
+def _me_payload(user_id: int):
+    """마이페이지용 (오픈 알림 목록, 좌석 취소 알림 목록). 템플릿에서 쓰는 컬럼만 dict로."""
+    my_open = db.session.execute(ME_OPEN_SELECT.where(MovieOpenAlert.user_id == user_id)).mappings()
+    my_seat = db.session.execute(ME_SEAT_SELECT.where(SeatCancelAlert.user_id == user_id)).mappings()
+    return [dict(row) for row in my_open], [dict(row) for row in my_seat]
+
+
 @app.get("/me")
 @login_required
 def me():
-    my_open = (
-        MovieOpenAlert.query.filter_by(user_id=current_user.id)
-        .order_by(MovieOpenAlert.id.asc())
-        .all()
-    )
-    my_seat = (
-        SeatCancelAlert.query.filter_by(user_id=current_user.id)
-        .order_by(SeatCancelAlert.id.asc())
-        .all()
-    )
-
-    for a in my_open:
-        a.theater_name = BRANCH_CODE_TO_NAME.get(a.theater, a.theater)
-    for a in my_seat:
-        a.theater_name = BRANCH_CODE_TO_NAME.get(a.theater, a.theater)
-
+    my_open, my_seat = _me_payload(current_user.id)
     return render_template("me.html", title="마이페이지", my_open=my_open, my_seat=my_seat)
 
 
@@ -466,6 +673,10 @@ def delete_my_seat(alert_id):
     return redirect(url_for("me"))
 
 
+# 테스트 메일 발송 결과를 요청 안에서 기다리는 최대 시간(초)
+TEST_EMAIL_WAIT_SEC = 2
+
+
 @app.route("/debug/test-email")
 @login_required
 def debug_test_email():
@@ -476,103 +687,208 @@ def debug_test_email():
     subject = "[Catch-Seat] SMTP 테스트 메일"
     body = "이 메일이 도착했다면 Catch-Seat SMTP 설정이 정상 동작 중입니다."
 
+    # SMTP 서버가 느리거나 멈춰도 요청 스레드가 붙잡히지 않도록 백그라운드에서 발송
+    future = email_worker.submit(app, send_email, to, subject, body)
     try:
-        send_email(to, subject, body)
+        # 설정 누락/즉시 거절 같은 빠른 에러는 바로 보여줌
+        future.result(timeout=TEST_EMAIL_WAIT_SEC)
+    except FuturesTimeoutError:
+        return f"테스트 메일을 {to} 로 발송 중입니다. (백그라운드 처리)", 202
     except Exception as e:
         return f"메일 발송 실패: {e}", 500
 
     return f"테스트 메일을 {to} 로 발송했습니다."
 
 
-@app.route("/debug/run-checks")
-@login_required
-def debug_run_checks():
-    from models import MovieOpenAlert, SeatCancelAlert, db
+# --- run-checks 알림 메일 본문 템플릿 (알림마다 바뀌는 값만 format으로 채움) ---
+OPEN_ALERT_BODY_TPL = "\n".join(
+    [
+        "안녕하세요, Catch-Seat 입니다.",
+        "",
+        "요청하신 '영화 오픈 알림' 조건에 해당하는 변화가 감지되었습니다.",
+        "- 영화: {movie}",
+        "- 극장: {theater}",
+        "- 상영관: {screen}",
+        "",
+        "자세한 예매 상황은 공식 예매 페이지에서 직접 확인해 주세요.",
+        "",
+        "Catch-Seat 드림",
+    ]
+)
+
+SEAT_ALERT_BODY_TPL = "\n".join(
+    [
+        "안녕하세요, Catch-Seat 입니다.",
+        "",
+        "요청하신 '좌석 취소 알림' 조건에 해당하는 변화가 감지되었습니다.",
+        "- 영화: {movie}",
+        "- 극장: {theater}",
+        "- 상영 시간: {show_datetime:%Y-%m-%d %H:%M}",
+        "- 원하는 좌석: {desired_seats}",
+        "",
+        "정확한 잔여 좌석 상황은 공식 예매 페이지에서 확인해 주세요.",
+        "",
+        "Catch-Seat 드림",
+    ]
+)
+
+
+def _restore_alerts(failed):
+    """
+    발송에 실패한 알림들의 상태(sent_at/send_count/is_sent)를 발송 전 값으로 되돌린다.
+    failed: [(모델, alert_id, 이전 상태), ...]
+    (app context 안에서 호출)
+    """
+    if not failed:
+        return
+    mappings = {}
+    for model, alert_id, prev in failed:
+        mappings.setdefault(model, []).append({"id": alert_id, **prev})
+    for model, rows in mappings.items():
+        db.session.bulk_update_mappings(model, rows)
+    db.session.commit()
+
+
+def _mark_sent(model, ids, now) -> None:
+    """ids 알림들을 '보냄' 상태로 (UPDATE ... WHERE id IN (...) 한 번)."""
+    if not ids:
+        return
+    db.session.execute(
+        update(model)
+        .where(model.id.in_(ids))
+        .values(sent_at=now, is_sent=True, send_count=func.coalesce(model.send_count, 0) + 1)
+    )
 
-    now = datetime.utcnow()
-    sent_count = 0
-    errors = []
 
-    open_alerts = MovieOpenAlert.query.filter_by(active=True).all()
+# run_alert_checks에서 좌석 취소 알림을 볼 상영 시각 범위 (지금 ~ 지금 + 24시간)
+SEAT_CHECK_WINDOW = timedelta(hours=24)
+
+
+def run_alert_checks() -> dict:
+    """
+    활성 알림을 훑어서 발송 대상에게 메일을 보낸다. (app context 안에서 호출)
+    /debug/run-checks 에서는 백그라운드 작업으로 등록해서 실행한다.
+    반환값: {"queued": 발송 시도 건수, "sent": 성공 건수, "errors": [에러 메시지, ...]}
+    """
+    now = utc_now()
+    # (모델, alert_id, 이전 상태, 받는 사람, 제목, 본문)
+    jobs = []
+    # 발송 표시(sent_at/send_count/is_sent)는 id만 모아 두었다가 테이블당 UPDATE 한 번으로 처리
+    open_ids = []
+    seat_ids = []
+
+    # 활성 알림의 last_checked는 UPDATE 한 번으로 일괄 갱신
+    db.session.execute(
+        update(MovieOpenAlert).where(MovieOpenAlert.active == True).values(last_checked=now)
+    )
+    db.session.execute(
+        update(SeatCancelAlert).where(SeatCancelAlert.active == True).values(last_checked=now)
+    )
+
+    # alert.user 접근 시 알림마다 SELECT가 나가지 않도록 유저를 같이 로드
+    # (그 밖의 lazy load는 raiseload로 막아서 새 N+1이 생기면 바로 드러나게)
+    # 발송 가능 여부(can_send_now)는 SQL 조건으로 걸러서 대상만 가져옴
+    open_alerts = (
+        MovieOpenAlert.query.options(joinedload(MovieOpenAlert.user), raiseload("*"))
+        .filter(MovieOpenAlert.can_send_now_clause(now))
+        .all()
+    )
     for alert in open_alerts:
-        alert.last_checked = now
-        if not alert.can_send_now(now):
-            continue
         user = alert.user
         if not user or not user.email:
             continue
 
         subject = f"[Catch-Seat] 영화 오픈 알림 - {alert.movie} / {alert.theater}"
-        body_lines = [
-            "안녕하세요, Catch-Seat 입니다.",
-            "",
-            "요청하신 '영화 오픈 알림' 조건에 해당하는 변화가 감지되었습니다.",
-            f"- 영화: {alert.movie}",
-            f"- 극장: {alert.theater}",
-            f"- 상영관: {alert.screen or '상영관 미지정'}",
-            "",
-            "자세한 예매 상황은 공식 예매 페이지에서 직접 확인해 주세요.",
-            "",
-            "Catch-Seat 드림",
-        ]
-        body = "\n".join(body_lines)
-
-        try:
-            send_email(user.email, subject, body)
-            alert.sent_at = now
-            alert.send_count = (alert.send_count or 0) + 1
-            alert.is_sent = True
-            sent_count += 1
-        except Exception as e:
-            errors.append(f"OpenAlert id={alert.id}: {e}")
+        body = OPEN_ALERT_BODY_TPL.format(
+            movie=alert.movie,
+            theater=alert.theater,
+            screen=alert.screen or "상영관 미지정",
+        )
 
-    seat_alerts = SeatCancelAlert.query.filter_by(active=True).all()
+        prev = {"sent_at": alert.sent_at, "send_count": alert.send_count, "is_sent": alert.is_sent}
+        open_ids.append(alert.id)
+        jobs.append((MovieOpenAlert, alert.id, prev, user.email, subject, body))
+
+    # 좌석 취소 알림은 상영이 앞으로 SEAT_CHECK_WINDOW 안에 있는 것만 (show_datetime 인덱스 사용)
+    # show_datetime은 폼에서 받은 로컬 시각이라 비교도 로컬 시각 기준
+    local_now = datetime.now()
+    seat_alerts = (
+        SeatCancelAlert.query.options(joinedload(SeatCancelAlert.user), raiseload("*"))
+        .filter(SeatCancelAlert.can_send_now_clause(now))
+        .filter(SeatCancelAlert.show_datetime.between(local_now, local_now + SEAT_CHECK_WINDOW))
+        .all()
+    )
     for alert in seat_alerts:
-        alert.last_checked = now
-        if not alert.can_send_now(now):
-            continue
         user = alert.user
         if not user or not user.email:
             continue
 
         subject = f"[Catch-Seat] 좌석 취소 알림 - {alert.movie} / {alert.theater}"
-        body_lines = [
-            "안녕하세요, Catch-Seat 입니다.",
-            "",
-            "요청하신 '좌석 취소 알림' 조건에 해당하는 변화가 감지되었습니다.",
-            f"- 영화: {alert.movie}",
-            f"- 극장: {alert.theater}",
-            f"- 상영 시간: {alert.show_datetime}",
-            f"- 원하는 좌석: {alert.desired_seats}",
-            "",
-            "정확한 잔여 좌석 상황은 공식 예매 페이지에서 확인해 주세요.",
-            "",
-            "Catch-Seat 드림",
-        ]
-        body = "\n".join(body_lines)
+        body = SEAT_ALERT_BODY_TPL.format(
+            movie=alert.movie,
+            theater=alert.theater,
+            show_datetime=alert.show_datetime,
+            desired_seats=alert.desired_seats,
+        )
 
-        try:
-            send_email(user.email, subject, body)
-            alert.sent_at = now
-            alert.send_count = (alert.send_count or 0) + 1
-            alert.is_sent = True
-            sent_count += 1
-        except Exception as e:
-            errors.append(f"SeatAlert id={alert.id}: {e}")
+        prev = {"sent_at": alert.sent_at, "send_count": alert.send_count, "is_sent": alert.is_sent}
+        seat_ids.append(alert.id)
+        jobs.append((SeatCancelAlert, alert.id, prev, user.email, subject, body))
 
+    # 발송 전에 '보냄' 상태를 먼저 커밋해서, 다음 체크가 같은 알림을 중복 발송하지 않게 함
+    # (실패하면 이전 상태로 되돌림)
+    _mark_sent(MovieOpenAlert, open_ids, now)
+    _mark_sent(SeatCancelAlert, seat_ids, now)
     db.session.commit()
+    if not jobs:
+        return {"queued": 0, "sent": 0, "errors": []}
+
+    # SMTP 연결 여러 개(SMTP_MAX_CONNECTIONS)로 나눠서 동시에 발송
+    messages = [(to, subject, body) for _, _, _, to, subject, body in jobs]
+    try:
+        results = send_email_parallel(messages)
+    except Exception as e:
+        # 연결/로그인 실패 → 전부 실패
+        results = [e] * len(jobs)
+
+    errors = []
+    failed = []
+    for (model, alert_id, prev, *_), err in zip(jobs, results):
+        if err is None:
+            continue
+        errors.append(f"{model.__name__} id={alert_id}: {err}")
+        failed.append((model, alert_id, prev))
+    _restore_alerts(failed)
+
+    return {"queued": len(jobs), "sent": len(jobs) - len(failed), "errors": errors}
+
+
+def _log_alert_checks_result(future):
+    exc = future.exception()
+    if exc is not None:
+        print(f"[run-checks] 실패: {exc}")
+        return
+    result = future.result()
+    print(f"[run-checks] 발송 {result['sent']}/{result['queued']}건")
+    for err in result["errors"]:
+        print(f"[EMAIL] 발송 실패: {err}")
+
+
+@app.route("/debug/run-checks")
+@login_required
+def debug_run_checks():
+    # 체크 + 메일 발송 전체를 체크 전용 백그라운드 워커에 넘기고 요청은 바로 반환
+    future = email_worker.submit(app, run_alert_checks, executor=email_worker.check_executor)
+    future.add_done_callback(_log_alert_checks_result)
 
     msg_lines = [
-        "run-checks 완료.",
-        f"총 발송 시도 성공 건수: {sent_count}",
+        "run-checks 작업을 등록했습니다.",
+        "(알림 체크와 메일 발송은 백그라운드에서 진행되며, 실패한 알림은 다음 체크 때 다시 시도됩니다.)",
     ]
-    if errors:
-        msg_lines.append("")
-        msg_lines.append("에러 목록:")
-        msg_lines.extend(errors)
 
     return "<br>".join(msg_lines)
 
 
+# 개발용 서버 (운영은 Procfile의 gunicorn 멀티 워커/스레드로 실행)
 if __name__ == "__main__":
     app.run()
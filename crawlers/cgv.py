@@ -1,10 +1,15 @@
 """
 CGV 상영 정보 크롤러 - 구현 불가
 """
+import os
+import re
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Optional
 from datetime import datetime
 
 
@@ -16,19 +21,48 @@ THEATER_CODES: Dict[str, str] = {
     # TODO: 필요하면 나중에 더 추가 가능
 }
 
-def get_showtimes(theater_code: str, date_yyyymmdd: str) -> List[Dict[str, Any]]:
+# 모든 요청이 공유하는 세션 (keep-alive 커넥션 재사용 + 일시적인 5xx는 재시도)
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+)
+SESSION.mount("https://", _ADAPTER)
+
+# 상영정보 영역(div.sect-showtimes)만 파싱 (나머지 DOM은 만들지 않음)
+# 파싱 중에는 class 값이 통째 문자열로 비교되므로, 다른 클래스가 같이 붙어 있어도 잡히도록 정규식 사용
+SHOWTIMES_STRAINER = SoupStrainer("div", class_=re.compile(r"(?:^|\s)sect-showtimes(?:\s|$)"))
+
+# 디버그 출력은 CATCHSEAT_DEBUG가 켜져 있을 때만
+DEBUG_LOG = bool(os.environ.get("CATCHSEAT_DEBUG"))
+# 받은 HTML을 파일로 덤프할 폴더 (지정했을 때만 저장; 평소 크롤링은 디스크를 건드리지 않음)
+CGV_DEBUG_DIR = os.environ.get("CATCHSEAT_CGV_DEBUG_DIR")
+
+@dataclass(slots=True)
+class Showtime:
+    """CGV 상영 회차 한 건"""
+
+    movie_title: str
+    screen_name: Optional[str]
+    start_time: Optional[str]
+    raw_time_text: str
+
+
+def get_showtimes(theater_code: str, date_yyyymmdd: str) -> List[Showtime]:
     """
     CGV 상영정보 페이지를 요청하고,
     영화 제목 / 상영관 / 시작 시간을 파싱해서 리스트로 반환한다.
 
     반환 예시:
     [
-        {
-            "movie_title": "듄: 파트2",
-            "screen_name": "IMAX관",
-            "start_time": "19:00",
-            "raw_time_text": "19:00"
-        },
+        Showtime(
+            movie_title="듄: 파트2",
+            screen_name="IMAX관",
+            start_time="19:00",
+            raw_time_text="19:00",
+        ),
         ...
     ]
     """
@@ -39,10 +73,9 @@ def get_showtimes(theater_code: str, date_yyyymmdd: str) -> List[Dict[str, Any]]
 
     try:
         # CGV가 직접 iframe URL 호출을 막는 경우가 있어 Referer 헤더를 함께 보냄
-        response = requests.get(
+        response = SESSION.get(
             url,
             headers={
-                "User-Agent": "Mozilla/5.0",
                 "Referer": f"https://www.cgv.co.kr/theater/?theaterCode={theater_code}&areacode=01",
             },
             timeout=10,
@@ -53,23 +86,25 @@ def get_showtimes(theater_code: str, date_yyyymmdd: str) -> List[Dict[str, Any]]
         return []
 
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.text, "lxml", parse_only=SHOWTIMES_STRAINER)
 
-        # ▼ 디버깅: 받은 HTML 전체를 파일로 저장해 구조를 직접 확인하기
-    debug_filename = f"debug_cgv_{theater_code}_{date_yyyymmdd}.html"
-    try:
-        with open(debug_filename, "w", encoding="utf-8") as f:
-            f.write(response.text)
-        print(f"[CGV DEBUG] HTML을 {debug_filename} 파일로 저장했습니다.")
-    except Exception as e:
-        print("[CGV ERROR] 디버그 HTML 저장 실패:", e)
-        
-    results: List[Dict[str, Any]] = []
+    # ▼ 디버깅: 받은 HTML 전체를 파일로 저장해 구조를 직접 확인하기 (CATCHSEAT_CGV_DEBUG_DIR 지정 시)
+    if CGV_DEBUG_DIR:
+        debug_filename = os.path.join(CGV_DEBUG_DIR, f"debug_cgv_{theater_code}_{date_yyyymmdd}.html")
+        try:
+            with open(debug_filename, "w", encoding="utf-8") as f:
+                f.write(response.text)
+            print(f"[CGV DEBUG] HTML을 {debug_filename} 파일로 저장했습니다.")
+        except Exception as e:
+            print("[CGV ERROR] 디버그 HTML 저장 실패:", e)
+
+    results: List[Showtime] = []
 
     # 전체 상영정보 영역
     sect = soup.select_one("div.sect-showtimes")
     if not sect:
-        print("[CGV DEBUG] sect-showtimes 영역을 찾지 못했습니다.")
+        if DEBUG_LOG:
+            print("[CGV DEBUG] sect-showtimes 영역을 찾지 못했습니다.")
         return results
 
     # 영화별 블록 (CGV 구조 기준: div.col-times 하나가 한 영화)
@@ -101,19 +136,20 @@ def get_showtimes(theater_code: str, date_yyyymmdd: str) -> List[Dict[str, Any]]
                 raw_time_text = t.get_text(strip=True)
 
                 results.append(
-                    {
-                        "movie_title": movie_title,
-                        "screen_name": screen_name,
-                        "start_time": start_time,
-                        "raw_time_text": raw_time_text,
-                    }
+                    Showtime(
+                        movie_title=movie_title,
+                        screen_name=screen_name,
+                        start_time=start_time,
+                        raw_time_text=raw_time_text,
+                    )
                 )
 
-    print(f"[CGV DEBUG] 파싱된 상영정보 개수: {len(results)}")
+    if DEBUG_LOG:
+        print(f"[CGV DEBUG] 파싱된 상영정보 개수: {len(results)}")
     return results
 
 
-def is_open_now(alert, showtimes: Optional[List[Dict[str, Any]]] = None) -> bool:
+def is_open_now(alert, showtimes: Optional[List[Showtime]] = None) -> bool:
     """
     MovieOpenAlert 인스턴스를 받아서,
     해당 영화가 해당 극장에서 해당 날짜에 '열려 있는지' 판단하는 함수.
@@ -134,7 +170,7 @@ def is_open_now(alert, showtimes: Optional[List[Dict[str, Any]]] = None) -> bool
     return False
 
 
-def has_desired_seats(alert, showtimes: Optional[List[Dict[str, Any]]] = None) -> bool:
+def has_desired_seats(alert, showtimes: Optional[List[Showtime]] = None) -> bool:
     """
     SeatCancelAlert 인스턴스를 받아서,
     '원하는 조건의 좌석이 있는지'를 판단하는 함수.
@@ -1,5 +1,13 @@
-from typing import List, Dict, Optional
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Dict, Optional, Tuple, Union
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ─────────────────────────────────────
 # DOLBY CINEMA 8개 지점 (brchNo 기준)
@@ -35,13 +43,28 @@ SESSION.headers.update(
         "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
         "Origin": "https://www.megabox.co.kr",
         "Referer": "https://www.megabox.co.kr/theater",
+        "Connection": "keep-alive",
     }
 )
+# keep-alive 커넥션 풀 + 일시적인 5xx 재시도
+# (schedulePage.do는 조회용 POST라 재시도해도 안전 → POST도 재시도 대상에 포함)
+# (배치 크롤링이 지점 8곳을 동시에 치므로 풀은 여유 있게)
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+    ),
+)
+SESSION.mount("https://", _ADAPTER)
 
 
-def _fetch_raw(branch_code: str, date_yyyymmdd: str) -> Dict:
+def _fetch_raw_bytes(branch_code: str, date_yyyymmdd: str) -> bytes:
     """
-    메가박스 지점별 상영시간표 JSON 원본을 가져오는 내부 함수.
+    메가박스 지점별 상영시간표 JSON 원본(bytes)을 가져오는 내부 함수.
 
     branch_code : 메가박스 지점 코드 (brchNo, 예: "0052")
     date_yyyymmdd : 'YYYYMMDD'
@@ -62,7 +85,12 @@ def _fetch_raw(branch_code: str, date_yyyymmdd: str) -> Dict:
     resp = SESSION.post(MEGABOX_SCHEDULE_URL, data=payload, timeout=10)
     resp.raise_for_status()
 
-    return resp.json()
+    return resp.content
+
+
+def _fetch_raw(branch_code: str, date_yyyymmdd: str) -> Dict:
+    """_fetch_raw_bytes 결과를 dict로 파싱 (응답이 UTF-8 JSON이라 bytes 그대로 orjson으로)"""
+    return orjson.loads(_fetch_raw_bytes(branch_code, date_yyyymmdd))
 
 
 def _format_seats(item: Dict) -> str:
@@ -85,7 +113,48 @@ def _format_seats(item: Dict) -> str:
     return f"잔여 {rest}석"
 
 
-def get_showtimes(branch_code: str, date_yyyymmdd: str) -> List[Dict]:
+# 상영관 이름 → DOLBY 여부 캐시
+# (지점별 상영관 이름 종류는 수십 개 수준이라 항목마다 lower() 하지 않고 이름당 한 번만 계산)
+_DOLBY_CACHE: Dict[str, bool] = {}
+
+
+def _is_dolby(screen_name: str) -> bool:
+    c = _DOLBY_CACHE.get(screen_name)
+    if c is None:
+        c = "dolby" in screen_name.lower()
+        _DOLBY_CACHE[screen_name] = c
+    return c
+
+
+# get_showtimes 결과 캐시: (branch_code, date_yyyymmdd) -> (저장 시각(monotonic), 상영정보 리스트, 응답 해시)
+# 여러 알림/요청이 같은 지점+날짜를 볼 때 메가박스 요청을 한 번으로 줄임
+# (잔여 좌석 수도 같이 캐시되므로 TTL은 짧게)
+# TTL이 지나 다시 받은 응답이 이전과 같으면(해시 비교) 파싱 없이 기존 리스트를 재사용
+SHOWTIMES_CACHE_TTL_SEC = 60
+_CACHE: Dict[Tuple[str, str], Tuple[float, List["Showtime"], bytes]] = {}
+_CACHE_MAX = 256
+_CACHE_LOCK = threading.Lock()
+
+
+@dataclass(slots=True)
+class Showtime:
+    """DOLBY 상영 회차 한 건 (dict 대신 슬롯 기반 레코드로 메모리 절약)"""
+
+    movie_title: str
+    screen_name: str
+    start_time: Optional[str]   # "HH:MM"
+    seats_status: str           # "잔여 N석" / "매진" / ""
+    bookable: bool              # 예매 가능 여부 (bokdAbleAt == "Y")
+    # 비교용으로 정규화한 제목/상영관 (크롤링 시 한 번만 계산해서 알림마다 재사용)
+    title_norm: str = field(init=False, repr=False, compare=False)
+    screen_norm: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.title_norm = _normalize_text(self.movie_title)
+        self.screen_norm = _normalize_text(self.screen_name)
+
+
+def get_showtimes(branch_code: str, date_yyyymmdd: str) -> List[Showtime]:
     """
     메가박스 상영정보 크롤링 (DOLBY CINEMA 전용)
 
@@ -94,31 +163,47 @@ def get_showtimes(branch_code: str, date_yyyymmdd: str) -> List[Dict]:
 
     반환 예시:
     [
-      {
-        "movie_title": "주토피아 2",
-        "screen_name": "DOLBY CINEMA [Laser]",
-        "start_time": "19:10",
-        "seats_status": "잔여 214석",
-        "bookable": True,  # 예매 가능 여부 (bokdAbleAt == "Y")
-      },
+      Showtime(
+        movie_title="주토피아 2",
+        screen_name="DOLBY CINEMA [Laser]",
+        start_time="19:10",
+        seats_status="잔여 214석",
+        bookable=True,  # 예매 가능 여부 (bokdAbleAt == "Y")
+      ),
       ...
     ]
 
     ❗ DOLBY 상영만 반환한다.
+    ❗ 같은 (지점, 날짜)는 SHOWTIMES_CACHE_TTL_SEC 동안 캐시된 결과를 돌려준다. (반환 리스트는 수정하지 말 것)
     """
-    raw = _fetch_raw(branch_code, date_yyyymmdd)
+    key = (branch_code, date_yyyymmdd)
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+    if entry is not None and now - entry[0] < SHOWTIMES_CACHE_TTL_SEC:
+        return entry[1]
+
+    content = _fetch_raw_bytes(branch_code, date_yyyymmdd)
+    content_hash = hashlib.blake2b(content, digest_size=16).digest()
+    if entry is not None and entry[2] == content_hash:
+        # 상영정보가 그대로면 JSON 파싱/Showtime 생성 없이 저장 시각만 갱신
+        with _CACHE_LOCK:
+            _CACHE[key] = (now, entry[1], content_hash)
+        return entry[1]
+
+    raw = orjson.loads(content)
 
     mega_map = raw.get("megaMap") or {}
     items = mega_map.get("movieFormList") or []
 
-    showtimes: List[Dict] = []
+    showtimes: List[Showtime] = []
 
     for item in items:
         # 상영관 이름
         screen_name = item.get("theabExpoNm") or item.get("theabEngNm") or ""
 
         # 🔹 DOLBY 상영만 필터링 (대소문자/공백 무시, 'dolby' 포함 여부)
-        if "dolby" not in screen_name.lower():
+        if not _is_dolby(screen_name):
             continue
 
         movie_title = item.get("rpstMovieNm") or item.get("movieNm") or ""
@@ -126,35 +211,131 @@ def get_showtimes(branch_code: str, date_yyyymmdd: str) -> List[Dict]:
         seats_status = _format_seats(item)
         bokd_able = item.get("bokdAbleAt") == "Y"  # 예매 가능 여부
 
-        # HHMM -> HH:MM 보정
+        # HHMM -> HH:MM 보정 (혹시 "9:30" 같은 4글자가 와도 깨지지 않게 ':' 검사는 유지)
         if isinstance(start_time, str) and len(start_time) == 4 and ":" not in start_time:
-            start_time = start_time[:2] + ":" + start_time[2:]
+            start_time = f"{start_time[:2]}:{start_time[2:]}"
 
         showtimes.append(
-            {
-                "movie_title": movie_title,
-                "screen_name": screen_name,
-                "start_time": start_time,
-                "seats_status": seats_status,
-                "bookable": bokd_able,
-            }
+            Showtime(
+                movie_title=movie_title,
+                screen_name=screen_name,
+                start_time=start_time,
+                seats_status=seats_status,
+                bookable=bokd_able,
+            )
         )
 
+    with _CACHE_LOCK:
+        if len(_CACHE) >= _CACHE_MAX:
+            # 만료된 항목 정리 (그래도 가득 차 있으면 전부 비움)
+            for k in [k for k, (ts, _, _) in _CACHE.items() if now - ts >= SHOWTIMES_CACHE_TTL_SEC]:
+                del _CACHE[k]
+            if len(_CACHE) >= _CACHE_MAX:
+                _CACHE.clear()
+        _CACHE[key] = (now, showtimes, content_hash)
     return showtimes
 
 
+def invalidate(branch_code: str, date_yyyymmdd: str) -> None:
+    """(지점, 날짜) 상영정보 캐시를 비운다. (다음 get_showtimes에서 다시 크롤링)"""
+    with _CACHE_LOCK:
+        _CACHE.pop((branch_code, date_yyyymmdd), None)
+
+
+# 여러 (지점, 날짜)를 한 번에 크롤링할 때 동시에 보낼 요청 수
+# (네트워크 대기 시간이 합이 아니라 최댓값이 되도록)
+BATCH_WORKERS = 8
+
+
+def _get_showtimes_or_error(key: Tuple[str, str]) -> Union[List[Showtime], Exception]:
+    branch_code, date_yyyymmdd = key
+    try:
+        return get_showtimes(branch_code, date_yyyymmdd)
+    except Exception as e:
+        return e
+
+
+def get_showtimes_batch(
+    keys: Iterable[Tuple[str, str]],
+) -> Dict[Tuple[str, str], Union[List[Showtime], Exception]]:
+    """
+    (branch_code, date_yyyymmdd) 목록의 상영정보를 병렬로 가져온다.
+    반환값: {key: 상영정보 리스트 또는 크롤링 중 발생한 예외}
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(keys))) as ex:
+        return dict(zip(keys, ex.map(_get_showtimes_or_error, keys)))
+
+
 # ─────────────────────────────────────
 # MovieOpenAlert 용 판별 로직
 # ─────────────────────────────────────
 
+# 제거할 공백 문자 (str.split()이 나누는 유니코드 공백 전체: NBSP, 전각 공백 \u3000 등 포함)
+_WS_TABLE = str.maketrans(
+    "", "",
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000",
+)
+
+
 def _normalize_text(s: Optional[str]) -> str:
     """영화 제목/상영관 비교용 단순 normalize"""
     if not s:
         return ""
-    # 공백 제거 + 소문자
-    return "".join(s.split()).lower()
+    # 공백 제거 + 소문자 (split/join 대신 translate 한 번, 유니코드 비교용으로 casefold)
+    return s.translate(_WS_TABLE).casefold()
+
+# alert 객체에서 값을 꺼낼 때 시도할 속성 이름들 (앞에 있을수록 우선)
+KEYWORD_ATTRS = ("movie_keyword", "movie", "movie_title", "movie_name", "title_ko", "title")
+SCREEN_ATTRS = ("screen_name", "screen", "theater_screen")
+VENDOR_ATTRS = ("vendor", "theater_vendor")
+BRANCH_ATTRS = ("branch_code", "theater_code", "cinema_code")
+DATE_ATTRS = ("date", "date_yyyymmdd", "play_date")
+
+# (alert 클래스, 후보 이름들) -> 그 클래스에 실제로 있는 속성 이름들 (후보 순서 유지)
+# 알림마다 없는 속성까지 getattr로 헛치지 않도록 클래스별로 한 번만 찾아 둔다.
+_ALERT_ATTR_CACHE: Dict[Tuple[type, Tuple[str, ...]], Tuple[str, ...]] = {}
+
+
+def _alert_field(alert, candidates: Tuple[str, ...]):
+    """
+    getattr(alert, a) or getattr(alert, b) or ... 와 같은 결과.
+    (앞 속성이 있어도 값이 None/빈 문자열이면 다음 후보로 넘어감)
+    """
+    key = (type(alert), candidates)
+    names = _ALERT_ATTR_CACHE.get(key)
+    if names is None:
+        names = _ALERT_ATTR_CACHE[key] = tuple(n for n in candidates if hasattr(alert, n))
+    for name in names:
+        value = getattr(alert, name, None)
+        if value:
+            return value
+    # 전부 비어 있으면 'or' 체인처럼 마지막 후보의 값
+    return getattr(alert, candidates[-1], None)
+
+
+def build_showtime_index(showtimes: List[Showtime]) -> Dict[str, List[str]]:
+    """
+    예매 가능한 상영만 모아서 {정규화된 영화 제목: [정규화된 상영관 이름, ...]} 로 묶는다.
+    같은 (지점, 날짜)의 알림 여러 개를 볼 때 한 번만 만들어서 is_open_now(index=...)에 넘기면,
+    키워드 부분문자열 검사를 상영 회차마다가 아니라 영화 제목마다 한 번씩만 한다.
+    """
+    index: Dict[str, List[str]] = {}
+    for st in showtimes:
+        if st.bookable:
+            index.setdefault(st.title_norm, []).append(st.screen_norm)
+    return index
+
 
-def is_open_now(alert, showtimes: Optional[List[Dict]] = None) -> bool:
+def is_open_now(
+    alert,
+    showtimes: Optional[List[Showtime]] = None,
+    index: Optional[Dict[str, List[str]]] = None,
+) -> bool:
     """
     MovieOpenAlert 에 대한 '예매 오픈 여부' 판별.
 
@@ -165,34 +346,26 @@ def is_open_now(alert, showtimes: Optional[List[Dict]] = None) -> bool:
     - run-checks 쪽에서 같은 날짜/지점에 대해
       get_showtimes(alert.branch_code, alert.date)를 먼저 호출해서
       그 결과를 showtimes 인자로 넘겨주는 구조를 권장한다.
+    - 알림이 여러 개면 build_showtime_index(showtimes)를 한 번 만들어 index 로 넘기면 된다.
 
     매칭 조건:
-    1) show['bookable'] 가 True (실제 예매 가능 상태)
+    1) show.bookable 이 True (실제 예매 가능 상태)
     2) 영화 제목: alert 에 저장된 키워드가 상영 영화 제목에 '포함'되는지
        (공백 제거 + 소문자로 normalize 후 부분문자열 검사)
     3) alert 에 상영관(screen_name)이 지정되어 있다면,
-       show['screen_name'] 안에 그 문자열(공백 제거/소문자)이 포함되는지 확인
+       show.screen_name 안에 그 문자열(공백 제거/소문자)이 포함되는지 확인
     """
-    if not showtimes:
-        # v1: 호출자가 반드시 showtimes를 넘겨줘야 함
-        return False
+    if index is None:
+        if not showtimes:
+            # v1: 호출자가 반드시 showtimes(또는 index)를 넘겨줘야 함
+            return False
+        index = build_showtime_index(showtimes)
 
     # alert 에서 영화 키워드 / 상영관 이름을 뽑아오기
     # movie_keyword 필드를 따로 만들었다면 그걸 최우선으로 쓰고,
     # 없다면 movie_title 등에 들어있는 값을 키워드로 사용.
-    keyword = (
-        getattr(alert, "movie_keyword", None)
-        or getattr(alert, "movie", None) 
-        or getattr(alert, "movie_title", None)
-        or getattr(alert, "movie_name", None)
-        or getattr(alert, "title_ko", None)
-        or getattr(alert, "title", None)
-    )
-    screen_pref = (
-        getattr(alert, "screen_name", None)
-        or getattr(alert, "screen", None)
-        or getattr(alert, "theater_screen", None)
-    )
+    keyword = _alert_field(alert, KEYWORD_ATTRS)
+    screen_pref = _alert_field(alert, SCREEN_ATTRS)
 
     keyword_norm = _normalize_text(keyword)
     screen_norm = _normalize_text(screen_pref)
@@ -201,21 +374,14 @@ def is_open_now(alert, showtimes: Optional[List[Dict]] = None) -> bool:
         # 키워드가 없으면 판단 불가 → False
         return False
 
-    for st in showtimes:
-        if not st.get("bookable", False):
-            # 아직 예매 안 열린 상영은 무시
-            continue
-
-        st_title_norm = _normalize_text(st.get("movie_title"))
-        st_screen_norm = _normalize_text(st.get("screen_name"))
-
+    for title_norm, screen_norms in index.items():
         # 1) 영화 제목: "키워드가 제목 안에 포함돼 있는지" 확인
         #    예: keyword="주토피아" → "주토피아2" / "주토피아 2" 모두 매칭
-        if keyword_norm not in st_title_norm:
+        if keyword_norm not in title_norm:
             continue
 
         # 2) 상영관이 선택된 경우: 부분일치 체크
-        if screen_norm and screen_norm not in st_screen_norm:
+        if screen_norm and not any(screen_norm in s for s in screen_norms):
             continue
 
         # → 여기까지 왔으면
@@ -243,17 +409,13 @@ def check_movie_open_megabox_dolby(alert) -> bool:
     """
 
     # 1) 벤더 체크
-    vendor = getattr(alert, "vendor", None) or getattr(alert, "theater_vendor", None)
+    vendor = _alert_field(alert, VENDOR_ATTRS)
     if vendor and str(vendor).lower() != "megabox":
         # 메가박스가 아니면 여기서는 False (다른 크롤러에서 처리)
         return False
 
     # 2) 지점 코드(branch_code) 추출
-    branch_code = (
-        getattr(alert, "branch_code", None)
-        or getattr(alert, "theater_code", None)
-        or getattr(alert, "cinema_code", None)
-    )
+    branch_code = _alert_field(alert, BRANCH_ATTRS)
     if not branch_code:
         # 지점 코드 없으면 판단 불가
         return False
@@ -261,15 +423,15 @@ def check_movie_open_megabox_dolby(alert) -> bool:
     branch_code = str(branch_code)
 
     # 3) 날짜(date_yyyymmdd) 추출
-    date_yyyymmdd = (
-        getattr(alert, "date", None)
-        or getattr(alert, "date_yyyymmdd", None)
-        or getattr(alert, "play_date", None)
-    )
+    date_yyyymmdd = _alert_field(alert, DATE_ATTRS)
     if not date_yyyymmdd:
         return False
 
-    date_yyyymmdd = str(date_yyyymmdd).replace("-", "")  # 혹시 YYYY-MM-DD 로 들어왔으면 제거
+    if hasattr(date_yyyymmdd, "strftime"):
+        # DB 모델의 date 컬럼(DATE) → 크롤러용 "YYYYMMDD"
+        date_yyyymmdd = date_yyyymmdd.strftime("%Y%m%d")
+    else:
+        date_yyyymmdd = str(date_yyyymmdd).replace("-", "")  # 혹시 YYYY-MM-DD 로 들어왔으면 제거
 
     # 4) DOLBY 8개 지점인지 확인
     if branch_code not in MEGABOX_DOLBY_BRANCHES:
@@ -310,8 +472,8 @@ if __name__ == "__main__":
 
     for st in showtimes[:10]:
         print(
-            f"- {st['movie_title']} / {st['screen_name']} / "
-            f"{st['start_time']} / {st['seats_status']} / bookable={st['bookable']}"
+            f"- {st.movie_title} / {st.screen_name} / "
+            f"{st.start_time} / {st.seats_status} / bookable={st.bookable}"
         )
 
     # 🔹 1) 영화 제목만으로 체크 (지점/날짜는 이미 showtimes 에 반영)
@@ -1,33 +1,186 @@
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from email.mime.text import MIMEText
+from email.policy import compat32
 from flask import current_app
 
-def send_email(to_email, subject, body):
-    host = current_app.config.get("SMTP_HOST")
-    port = current_app.config.get("SMTP_PORT")
-    user = current_app.config.get("SMTP_USER")
-    password = current_app.config.get("SMTP_PASSWORD")
-    use_tls = current_app.config.get("SMTP_USE_TLS")
-    default_sender = current_app.config.get("SMTP_DEFAULT_SENDER")
+
+@dataclass(frozen=True, slots=True)
+class SMTPConf:
+    """앱 시작 시 한 번 읽어 둔 SMTP 설정 (메일마다 current_app.config를 뒤지지 않도록)"""
+
+    host: str | None
+    port: int | None
+    user: str | None
+    password: str | None
+    use_tls: bool
+    default_sender: str | None
+    max_connections: int
+
+
+_CONF: SMTPConf | None = None
+
+
+def init_email(app) -> SMTPConf:
+    """app.config의 SMTP_* 설정을 읽어서 모듈에 저장. (설정을 채운 뒤 앱 초기화 때 한 번 호출)"""
+    global _CONF
+    _CONF = SMTPConf(
+        host=app.config.get("SMTP_HOST"),
+        port=app.config.get("SMTP_PORT"),
+        user=app.config.get("SMTP_USER"),
+        password=app.config.get("SMTP_PASSWORD"),
+        use_tls=bool(app.config.get("SMTP_USE_TLS")),
+        default_sender=app.config.get("SMTP_DEFAULT_SENDER"),
+        max_connections=app.config.get("SMTP_MAX_CONNECTIONS") or 1,
+    )
+    return _CONF
+
+
+def _conf() -> SMTPConf:
+    conf = _CONF
+    if conf is None:
+        # init_email()을 안 거친 경우(스크립트 등)에는 현재 앱 설정으로 한 번 초기화
+        conf = init_email(current_app)
+    return conf
+
+
+def _smtp_settings() -> SMTPConf:
+    conf = _conf()
 
     # 필수 설정 체크
-    if not host or not user or not password or not default_sender:
+    if not conf.host or not conf.user or not conf.password or not conf.default_sender:
         raise ValueError(
             "SMTP 설정(SMTP_HOST / SMTP_USER / SMTP_PASSWORD / SMTP_DEFAULT_SENDER)이 누락되었습니다."
         )
 
+    return conf
+
+
+def _open_smtp(conf: SMTPConf):
+    # SMTP 연결
+    server = smtplib.SMTP(conf.host, conf.port)
+    if conf.use_tls:
+        server.starttls()
+
+    # 로그인
+    server.login(conf.user, conf.password)
+    return server
+
+
+def _build_message(sender, to_email, subject, body):
     # MIME 메일 만들기
     msg = MIMEText(body, "html")
     msg["Subject"] = subject
-    msg["From"] = default_sender
+    msg["From"] = sender
     msg["To"] = to_email
+    return msg
 
-    # SMTP 연결
-    server = smtplib.SMTP(host, port)
-    if use_tls:
-        server.starttls()
+
+# SMTP로 보낼 그대로의 줄바꿈(CRLF)으로 직렬화 → smtplib이 메일마다 다시 변환/인코딩하지 않음
+# (max_line_length=None: 예전 as_string()처럼 헤더를 접지 않음)
+_SMTP_POLICY = compat32.clone(linesep="\r\n", max_line_length=None)
+
+
+def _message_string(cache, sender, to_email, subject, body):
+    """
+    발송용 MIME 메시지. 같은 (제목, 본문)이면 To 헤더를 뺀 인코딩 결과(bytes)를 cache에서 재사용하고
+    To 줄만 앞에 붙인다. (같은 알림 메일을 여러 명에게 보낼 때 MIME 인코딩을 한 번만)
+    """
+    if not to_email.isascii():
+        # 비ASCII 주소는 헤더 인코딩이 필요하므로 정식으로 생성
+        return _build_message(sender, to_email, subject, body).as_string()
+
+    key = (subject, body)
+    base = cache.get(key)
+    if base is None:
+        msg = MIMEText(body, "html")
+        msg["Subject"] = subject
+        msg["From"] = sender
+        base = cache[key] = msg.as_bytes(policy=_SMTP_POLICY)
+    return b"To: " + to_email.encode("ascii") + b"\r\n" + base
+
+
+def send_email(to_email, subject, body):
+    conf = _smtp_settings()
+
+    msg = _build_message(conf.default_sender, to_email, subject, body)
 
     # 로그인 후 발송
-    server.login(user, password)
-    server.sendmail(default_sender, [to_email], msg.as_string())
+    server = _open_smtp(conf)
+    server.sendmail(conf.default_sender, [to_email], msg.as_string())
     server.quit()
+
+
+def send_email_bulk(messages):
+    """
+    여러 통의 메일을 SMTP 연결 하나로 보낸다.
+    messages: [(to_email, subject, body), ...]
+    반환값: messages와 같은 순서의 리스트. 성공한 메일은 None, 실패한 메일은 예외 객체.
+    (연결/로그인 자체가 실패하면 예외를 그대로 올림)
+    """
+    if not messages:
+        return []
+
+    conf = _smtp_settings()
+
+    results = []
+    encoded = {}  # (제목, 본문) -> To 헤더를 뺀 MIME 바이트
+    server = _open_smtp(conf)
+    try:
+        for to_email, subject, body in messages:
+            message = _message_string(encoded, conf.default_sender, to_email, subject, body)
+            try:
+                server.sendmail(conf.default_sender, [to_email], message)
+                results.append(None)
+            except smtplib.SMTPServerDisconnected as e:
+                # 서버가 연결을 끊었으면 남은 메일은 모두 실패 처리 (다음 체크 때 재시도)
+                results.append(e)
+                results.extend([e] * (len(messages) - len(results)))
+                break
+            except Exception as e:
+                results.append(e)
+    finally:
+        try:
+            server.quit()
+        except smtplib.SMTPException:
+            pass
+
+    return results
+
+
+def send_email_parallel(messages, max_connections=None):
+    """
+    메일을 최대 max_connections 개의 SMTP 연결로 나눠서 동시에 보낸다.
+    (연결마다 send_email_bulk 한 번 → 전체 시간이 대략 N / 연결 수 로 줄어듦)
+    max_connections를 안 주면 SMTP_MAX_CONNECTIONS 설정값을 쓴다.
+    반환값: send_email_bulk와 같음. 단, 어떤 연결의 접속/로그인이 실패하면
+    그 연결이 맡은 메일들만 해당 예외로 채워서 돌려준다.
+    """
+    if not messages:
+        return []
+
+    if max_connections is None:
+        max_connections = _conf().max_connections
+    k = max(1, min(max_connections, len(messages)))
+    if k == 1:
+        return send_email_bulk(messages)
+
+    # init_email() 전이라 설정을 current_app에서 읽어야 하는 경우를 위해 워커에도 app context를 넘김
+    app = current_app._get_current_object()
+    chunks = [messages[i::k] for i in range(k)]
+
+    def _send_chunk(chunk):
+        with app.app_context():
+            try:
+                return send_email_bulk(chunk)
+            except Exception as e:
+                return [e] * len(chunk)
+
+    with ThreadPoolExecutor(max_workers=k, thread_name_prefix="smtp") as ex:
+        chunk_results = list(ex.map(_send_chunk, chunks))
+
+    results = [None] * len(messages)
+    for i, chunk_result in enumerate(chunk_results):
+        results[i::k] = chunk_result
+    return results
@@ -0,0 +1,22 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# 메일 발송(SMTP 연결/STARTTLS/로그인/전송)은 요청 스레드 밖에서 처리
+EMAIL_WORKERS = 4
+
+executor = ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix="email")
+
+# 알림 체크(run_alert_checks)는 한 번에 하나씩만 돌도록 전용 워커 1개
+# (같은 알림을 두 체크가 동시에 집어서 중복 발송하지 않게)
+check_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-checks")
+
+
+def submit(app, fn, *args, executor=executor, **kwargs) -> Future:
+    """
+    fn(*args, **kwargs)를 백그라운드 스레드에서 app context 안에서 실행한다.
+    (send_email 처럼 current_app.config를 읽는 함수도 그대로 넘길 수 있음)
+    """
+    def _run():
+        with app.app_context():
+            return fn(*args, **kwargs)
+
+    return executor.submit(_run)
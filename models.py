@@ -1,10 +1,55 @@
-from datetime import datetime
+import os
+from datetime import datetime, timedelta, timezone
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import and_, cast, func, literal, or_
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+# 비밀번호 해시 방식과 비용 (해시 한 번에 ~100ms 정도가 되도록 서버에 맞춰 조정)
+# 기본값 scrypt:32768:8:1 (N=2^15, r=8, p=1)은 개발 PC에서 한 번에 ~130ms
+# 예: 느린 서버면 CATCHSEAT_PASSWORD_HASH_METHOD="scrypt:16384:8:1" (~65ms)
+# 검증(check_password_hash)은 저장된 해시에 적힌 방식을 따르므로 바꿔도 기존 계정은 그대로 로그인 가능
+PASSWORD_HASH_METHOD = os.environ.get("CATCHSEAT_PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+# 발송 간 최소 간격 기본값(분). cooldown_min 이 NULL 인 예전 행도 이 값으로 취급
+DEFAULT_COOLDOWN_MIN = 30
+
+
+def utc_now() -> datetime:
+    """
+    DB에 저장하는 UTC 시각 (sent_at / last_checked 는 tz 없는 UTC로 저장되어 있음)
+    datetime.utcnow()는 deprecated 이므로 now(timezone.utc)에서 tzinfo만 뗀다.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _can_send_now_clause(model, now):
+    """
+    can_send_now() 과 같은 규칙을 SQL 조건식으로 만든 것.
+    (발송 가능한 알림만 DB에서 골라 오도록 query.filter(...)에 넣어서 사용)
+
+    쿨다운은 행마다 cooldown_min 이 달라서 SQLite datetime()으로 계산:
+        datetime(sent_at, '+' || coalesce(cooldown_min, 30) || ' minutes') <= now
+
+    active 는 .is_(True) 대신 == 로 비교
+    (SQLite는 "IS true" 조건에는 (active, is_sent, sent_at) 인덱스를 쓰지 않음)
+    is_sent / cooldown_min 은 NULL 인 예전 행도 can_send_now() 와 같게 판단하도록 coalesce
+    """
+    cooldown_min = func.coalesce(model.cooldown_min, DEFAULT_COOLDOWN_MIN)
+    cooldown_end = func.datetime(
+        model.sent_at,
+        literal("+") + cast(cooldown_min, db.String) + literal(" minutes"),
+        type_=db.DateTime,
+    )
+    return and_(
+        model.active == True,
+        func.coalesce(model.is_sent, False) == False,
+        or_(model.sent_at.is_(None), cooldown_end <= now),
+    )
+
+
 # ----------- User -----------
 class User(db.Model, UserMixin):
     __tablename__ = "users"
@@ -21,7 +66,7 @@ class User(db.Model, UserMixin):
 
     # 비밀번호 유틸
     def set_password(self, pw: str) -> None:
-        self.password_hash = generate_password_hash(pw)
+        self.password_hash = generate_password_hash(pw, method=PASSWORD_HASH_METHOD)
 
     def check_password(self, pw: str) -> bool:
         return check_password_hash(self.password_hash, pw)
@@ -33,17 +78,25 @@ class User(db.Model, UserMixin):
 # ----------- Alerts: Movie Open -----------
 class MovieOpenAlert(db.Model):
     __tablename__ = "movie_open_alerts"
+    __table_args__ = (
+        # run-checks: can_send_now_clause() (active / is_sent / sent_at)
+        db.Index("ix_movie_open_alerts_active_is_sent_sent_at", "active", "is_sent", "sent_at"),
+        # run_checks.py: 지점 + 날짜 그룹 (theater 단독 조회도 앞 컬럼으로 사용)
+        db.Index("ix_movie_open_alerts_theater_date", "theater", "date"),
+        # 마이페이지: filter_by(user_id=...).order_by(id)
+        db.Index("ix_movie_open_alerts_user_id_id", "user_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     # 개발 단계: NULL 허용 (나중에 nullable=False로 바꿀 수 있음)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
     movie = db.Column(db.String(200), nullable=False, index=True)
-    theater = db.Column(db.String(100), nullable=False, index=True)
+    theater = db.Column(db.String(100), nullable=False)
     screen = db.Column(db.String(100))
 
-    # 🔹 관람/상영 날짜 (예: "20251208" 형식)
+    # 🔹 관람/상영 날짜 (DATE; 크롤러에 넘길 때만 "YYYYMMDD"로 변환)
     # 기존 데이터가 있어서 우선 nullable=True로 두고, 나중에 모두 채운 뒤 NOT NULL로 바꿀 수 있음.
-    date = db.Column(db.String(8), index=True, nullable=True)
+    date = db.Column(db.Date, index=True, nullable=True)
 
     # ✅ 알림 신청 시점도 한국 로컬 시간 기준으로 저장
     created_at = db.Column(db.DateTime, default=datetime.now)
@@ -62,7 +115,7 @@ class MovieOpenAlert(db.Model):
     # 지금까지 총 몇 번 보냈는지
     send_count = db.Column(db.Integer, default=0, nullable=False)
     # 발송 간 최소 간격(분 단위)
-    cooldown_min = db.Column(db.Integer, default=30, nullable=False)
+    cooldown_min = db.Column(db.Integer, default=DEFAULT_COOLDOWN_MIN, nullable=False)
 
     def can_send_now(self, now=None):
         """
@@ -79,14 +132,21 @@ class MovieOpenAlert(db.Model):
             return False
 
         if now is None:
-            now = datetime.utcnow()
+            now = utc_now()
 
         # 아직 한 번도 보낸 적 없으면 바로 OK
         if self.sent_at is None:
             return True
 
-        delta = now - self.sent_at
-        return delta.total_seconds() >= self.cooldown_min * 60
+        cooldown_min = self.cooldown_min if self.cooldown_min is not None else DEFAULT_COOLDOWN_MIN
+        return now - self.sent_at >= timedelta(minutes=cooldown_min)
+
+    @classmethod
+    def can_send_now_clause(cls, now=None):
+        """can_send_now()의 SQL 버전 (예: MovieOpenAlert.query.filter(MovieOpenAlert.can_send_now_clause(now)))"""
+        if now is None:
+            now = utc_now()
+        return _can_send_now_clause(cls, now)
 
     def __repr__(self) -> str:
         return f"<OpenAlert id={self.id} movie={self.movie} theater={self.theater}>"
@@ -104,6 +164,16 @@ class SeatCancelAlert(db.Model):
       이후 잔여좌석 수가 baseline + desired_count 이상으로 증가하면 알림 발송.
     """
     __tablename__ = "seat_cancel_alerts"
+    __table_args__ = (
+        # run-checks: filter_by(active=True) + show_datetime 범위 (active만 거는 조회도 앞 컬럼으로 사용)
+        db.Index("ix_seat_cancel_alerts_active_show_datetime", "active", "show_datetime"),
+        # run_checks.py: can_send_now_clause() (active / is_sent / sent_at)
+        db.Index("ix_seat_cancel_alerts_active_is_sent_sent_at", "active", "is_sent", "sent_at"),
+        # 지점 + 상영 일시 그룹 (theater 단독 조회도 앞 컬럼으로 사용)
+        db.Index("ix_seat_cancel_alerts_theater_show_datetime", "theater", "show_datetime"),
+        # 마이페이지: filter_by(user_id=...).order_by(id)
+        db.Index("ix_seat_cancel_alerts_user_id_id", "user_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -116,12 +186,12 @@ class SeatCancelAlert(db.Model):
     brand = db.Column(db.String(20), nullable=False, default="MEGABOX", index=True)
 
     movie = db.Column(db.String(200), nullable=False, index=True)
-    theater = db.Column(db.String(100), nullable=False, index=True)  # 지점 코드/ID
+    theater = db.Column(db.String(100), nullable=False)  # 지점 코드/ID
     screen = db.Column(db.String(100))                               # 상영관 이름/번호
 
-    # 상영 일시(문자열 형태로 저장; 예: "2025-12-24 19:30")
-    # 실제 크롤링/체크 로직에서 필요하면 "YYYYMMDD" + "HHMM" 으로 파싱해서 사용
-    show_datetime = db.Column(db.String(40), nullable=False)
+    # 상영 일시 (DATETIME, 로컬 시간 기준; 예: 2025-12-24 19:30)
+    # "곧 시작하는 회차만" 같은 시간 범위 조회가 인덱스를 타도록 문자열 대신 DATETIME으로 저장
+    show_datetime = db.Column(db.DateTime, nullable=False, index=True)
 
     # 🔹 사용자가 원하는 좌석 조건
     # 예: "E11,E12" (좌석 리스트) - 좌석 지정이 없는 경우도 있으니 옵션 처리
@@ -148,7 +218,7 @@ class SeatCancelAlert(db.Model):
     # 🔹 발송 쿨다운/중복 방지용 필드
     sent_at = db.Column(db.DateTime, nullable=True)
     send_count = db.Column(db.Integer, default=0, nullable=False)
-    cooldown_min = db.Column(db.Integer, default=30, nullable=False)
+    cooldown_min = db.Column(db.Integer, default=DEFAULT_COOLDOWN_MIN, nullable=False)
 
     def can_send_now(self, now=None):
         """
@@ -166,13 +236,20 @@ class SeatCancelAlert(db.Model):
             return False
 
         if now is None:
-            now = datetime.utcnow()
+            now = utc_now()
 
         if self.sent_at is None:
             return True
 
-        delta = now - self.sent_at
-        return delta.total_seconds() >= self.cooldown_min * 60
+        cooldown_min = self.cooldown_min if self.cooldown_min is not None else DEFAULT_COOLDOWN_MIN
+        return now - self.sent_at >= timedelta(minutes=cooldown_min)
+
+    @classmethod
+    def can_send_now_clause(cls, now=None):
+        """can_send_now()의 SQL 버전"""
+        if now is None:
+            now = utc_now()
+        return _can_send_now_clause(cls, now)
 
     def __repr__(self) -> str:
         return (
@@ -13,7 +13,7 @@ run_checks.py
    - ✅ 예매 오픈(TRIGGER) 시 사용자에게 메일 발송
 
 2) 좌석 취소 알림 (SeatCancelAlert)
-   - SeatCancelAlert 중 active=True, is_sent=False 조회
+   - SeatCancelAlert 중 발송 가능한 것(active, 미발송, 쿨다운 경과)만 조회
    - show_datetime 기준으로 날짜(YYYYMMDD)를 뽑아서
      지점 + 날짜별로 get_showtimes() 한 번만 호출
    - 영화 제목, 상영관, 시간(HHMM)으로 상영 회차를 매칭
@@ -28,17 +28,28 @@ SMTP 환경변수:
     CATCHSEAT_SMTP_PASSWORD (또는 CATCHSEAT_SMTP_PASS)
     CATCHSEAT_SMTP_USE_TLS
     CATCHSEAT_SMTP_DEFAULT_SENDER
+    CATCHSEAT_SMTP_MAX_CONNECTIONS (동시 발송에 쓸 SMTP 연결 수, 기본 4)
+
+로그:
+    CATCHSEAT_DEBUG 가 설정되어 있으면 알림별 상세 로그(· ... 줄)도 출력
 """
 
 import os
+import re
 import datetime
 import smtplib
-import json
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import orjson
+from sqlalchemy import func, update
+from sqlalchemy.orm import joinedload, load_only
 from email.mime.text import MIMEText
-from email.utils import formataddr
+from email.policy import compat32
 
 from app import app           # Flask 앱 객체
-from models import db, MovieOpenAlert, SeatCancelAlert
+from models import db, MovieOpenAlert, SeatCancelAlert, User, utc_now
 from crawlers import megabox
 
 
@@ -54,16 +65,28 @@ BRANCH_CODE_TO_NAME = {
     "4651": "메가박스 하남스타필드",
 }
 
+# 문자열에서 숫자 부분만 뽑을 때 사용 (문자마다 isdigit() 하는 제너레이터 대신)
+_DIGITS_RE = re.compile(r"\d+")
+# showtime 시작 시간의 일반적인 형태 ('19:30')
+_TIME_COLON_RE = re.compile(r"(\d{2}):(\d{2})$")
+
 # --- 인기 좌석 구역 요약 데이터 로드 (seat_zone_summary.json) ---
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 ZONE_PATH = os.path.join(BASE_DIR, "data", "seat_zone_summary.json")
 
 try:
-    with open(ZONE_PATH, encoding="utf-8") as f:
-        ZONE_SUMMARY = json.load(f)
+    with open(ZONE_PATH, "rb") as f:
+        ZONE_SUMMARY = orjson.loads(f.read())
 except FileNotFoundError:
     ZONE_SUMMARY = {}
 
+# 지점 코드 -> 요약 문구만 뽑아서 평평하게
+ZONE_STRINGS = {
+    code: entry["zone_summary"]
+    for code, entry in ZONE_SUMMARY.items()
+    if entry and "zone_summary" in entry
+}
+
 
 def get_zone_summary(branch_code: str) -> str | None:
     """
@@ -71,10 +94,7 @@ def get_zone_summary(branch_code: str) -> str | None:
     - 데이터가 있으면 zone_summary 문자열 반환
     - 없으면 None
     """
-    entry = ZONE_SUMMARY.get(branch_code)
-    if entry and "zone_summary" in entry:
-        return entry["zone_summary"]
-    return None
+    return ZONE_STRINGS.get(branch_code)
 
 
 # --- SMTP / 메일 설정 (환경변수 사용) ---
@@ -87,12 +107,206 @@ SMTP_PASS = (
 )
 SMTP_USE_TLS = os.environ.get("CATCHSEAT_SMTP_USE_TLS", "true").lower() == "true"
 SMTP_DEFAULT_SENDER = os.environ.get("CATCHSEAT_SMTP_DEFAULT_SENDER")
+# 로그인 정보가 없으면 메일 단계 자체를 건너뜀 (경고는 알림마다가 아니라 한 번만 출력)
+SMTP_CONFIGURED = bool(SMTP_USER and SMTP_PASS)
 
 if SMTP_DEFAULT_SENDER:
     SENDER_HEADER = SMTP_DEFAULT_SENDER
 else:
     SENDER_HEADER = f"Catch-Seat Alert Service <{SMTP_USER or ''}>"
 
+# 메일은 스캔이 끝난 뒤 모아서 SMTP_MAX_CONNECTIONS 개의 연결로 동시에 발송
+# (연결 하나에서는 SMTP가 직렬이라, 연결 여러 개로 TLS/전송 대기 시간을 겹치게 함)
+SMTP_MAX_CONNECTIONS = int(os.environ.get("CATCHSEAT_SMTP_MAX_CONNECTIONS", "4"))
+# 같은 내용 메일을 숨은 참조로 묶어 보낼 때 트랜잭션 하나당 최대 수신자 수 (Gmail 등은 100명 제한)
+SMTP_MAX_RCPT = 50
+# 연결 하나로 이만큼 보냈으면 끊고 새로 로그인 (오래 붙어 있는 세션을 서버가 제한/차단하는 것 방지)
+SMTP_MAX_MESSAGES_PER_CONN = 100
+
+# 알림 한 건마다 찍는 상세 로그(· ... 줄)는 CATCHSEAT_DEBUG 가 있을 때만 출력
+# (개수/TRIGGER/에러 줄과 요약 줄은 항상 출력)
+DEBUG_LOG = bool(os.environ.get("CATCHSEAT_DEBUG"))
+
+# 실행 요약 집계 (scheduler.py가 stdout을 파싱하지 않고 이 값을 바로 읽음)
+# - movie_active / seat_active: 발송 가능한 알림 개수
+# - triggered: 트리거된 알림 수 (OPEN + SEAT)
+# - errors: 크롤링/메일 발송/DB 커밋 실패 건수
+RUN_STATS: Counter = Counter()
+
+# 발송 스레드마다 로그인한 SMTP 연결 하나를 재사용 (메일마다 연결/STARTTLS/로그인 반복 X)
+_smtp_local = threading.local()
+_smtp_servers: list[smtplib.SMTP] = []   # close_smtp()에서 한 번에 닫기 위해 열린 연결 모음
+_smtp_servers_lock = threading.Lock()
+
+
+def _get_smtp() -> smtplib.SMTP:
+    """
+    현재 스레드의 로그인된 SMTP 연결을 반환. 없으면 새로 연결한다.
+    (살아 있는지는 매번 NOOP으로 확인하지 않고, 발송하다 끊긴 게 보이면 _smtp_sendmail에서 다시 연결)
+    """
+    server = getattr(_smtp_local, "server", None)
+    if server is not None:
+        return server
+
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    if SMTP_USE_TLS:
+        server.starttls()
+    server.login(SMTP_USER, SMTP_PASS)
+    _smtp_local.server = server
+    _smtp_local.sent = 0
+    with _smtp_servers_lock:
+        _smtp_servers.append(server)
+    return server
+
+
+# (제목, 본문) -> To 헤더를 뺀 MIME 바이트 (SMTP 그대로 CRLF 줄바꿈)
+# 같은 영화/지점 알림을 여러 명이 신청했으면 본문이 같으므로 MIME 인코딩은 한 번만 하고 To만 바꿔 붙임
+# bytes로 넘기면 smtplib이 메일마다 줄바꿈 변환 + ASCII 인코딩을 다시 하지 않음
+# (max_line_length=None: 예전 as_string()처럼 헤더를 접지 않음)
+_mime_cache: dict[tuple[str, str], bytes] = {}
+_SMTP_POLICY = compat32.clone(linesep="\r\n", max_line_length=None)
+
+
+def _build_mime(to_email: str | None, subject: str, body: str) -> str | bytes:
+    """
+    발송용 MIME 메시지 생성 (제목/본문이 같으면 캐시된 인코딩 결과 재사용)
+    to_email이 None이면 여러 명에게 숨은 참조로 보내는 메일 (To: undisclosed-recipients)
+    """
+    if to_email is None:
+        to_email = "undisclosed-recipients:;"
+    elif not to_email.isascii():
+        # 비ASCII 주소는 헤더 인코딩이 필요하므로 매번 정식으로 생성
+        msg = MIMEText(body, _charset="utf-8")
+        msg["Subject"] = subject
+        msg["From"] = SENDER_HEADER
+        msg["To"] = to_email
+        return msg.as_string()
+
+    key = (subject, body)
+    base = _mime_cache.get(key)
+    if base is None:
+        msg = MIMEText(body, _charset="utf-8")
+        msg["Subject"] = subject
+        msg["From"] = SENDER_HEADER
+        base = _mime_cache[key] = msg.as_bytes(policy=_SMTP_POLICY)
+    return b"To: " + to_email.encode("ascii") + b"\r\n" + base
+
+
+def _smtp_sendmail(to_emails: list[str], message: str | bytes) -> dict:
+    """
+    재사용 연결로 발송. 서버가 연결을 끊었으면 한 번만 다시 연결해서 재시도.
+    (오래 놀던 연결은 서버가 그냥 닫거나, MAIL FROM에 421로 응답하고 닫음)
+    반환값: 거부된 수신자 {주소: (코드, 메시지)} (전원 거부면 SMTPRecipientsRefused)
+    """
+    try:
+        refused = _get_smtp().sendmail(SMTP_USER, to_emails, message)
+    except (smtplib.SMTPServerDisconnected, smtplib.SMTPSenderRefused) as e:
+        if isinstance(e, smtplib.SMTPSenderRefused) and e.smtp_code != 421:
+            raise
+        _recycle_smtp()
+        refused = _get_smtp().sendmail(SMTP_USER, to_emails, message)
+
+    _smtp_local.sent += 1
+    if _smtp_local.sent >= SMTP_MAX_MESSAGES_PER_CONN:
+        _recycle_smtp()
+    return refused
+
+
+def _recycle_smtp() -> None:
+    """현재 스레드의 연결을 닫는다. (다음 발송 때 _get_smtp()가 새로 연결)"""
+    server = _smtp_local.server
+    _smtp_local.server = None
+    with _smtp_servers_lock:
+        if server in _smtp_servers:
+            _smtp_servers.remove(server)
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        pass
+
+
+def close_smtp() -> None:
+    """발송이 끝난 뒤 열린 SMTP 연결과 MIME 캐시 정리"""
+    _mime_cache.clear()
+    _smtp_local.server = None
+
+    with _smtp_servers_lock:
+        servers = list(_smtp_servers)
+        _smtp_servers.clear()
+    for server in servers:
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+
+def _send_bucket(subject: str, body: str, rcpts: list[tuple[int, str]], label: str) -> list[int]:
+    """
+    같은 (제목, 본문) 메일을 SMTP 트랜잭션 한 번으로 보낸다. (받는 사람이 여럿이면 숨은 참조)
+    rcpts: [(alert_id, 받는 사람), ...]
+    반환값: 발송에 성공한 알림 id 목록
+    """
+    to_emails = [to for _, to in rcpts]
+    message = _build_mime(to_emails[0] if len(to_emails) == 1 else None, subject, body)
+
+    try:
+        refused = _smtp_sendmail(to_emails, message)
+    except Exception as e:
+        for alert_id, to_email in rcpts:
+            print(f"[run_checks] ❌ 메일 전송 실패: to={to_email}, {label} id={alert_id}, error={e}")
+        return []
+
+    ok_ids = []
+    for alert_id, to_email in rcpts:
+        if to_email in refused:
+            print(f"[run_checks] ❌ 메일 전송 실패: to={to_email}, {label} id={alert_id}, "
+                  f"error={refused[to_email]}")
+        else:
+            print(f"[run_checks] ✉ 메일 전송 완료: to={to_email}, {label} id={alert_id}")
+            ok_ids.append(alert_id)
+    return ok_ids
+
+
+def _send_pending(pending: list, label: str) -> list[int]:
+    """
+    스캔 중에 모아 둔 메일들을 발송하고, 성공한 알림 id 목록을 반환한다.
+    pending: [(alert_id, 받는 사람, 제목, 본문), ...]
+    label  : 로그용 알림 종류 ("MovieOpenAlert" / "SeatCancelAlert")
+
+    - 제목/본문이 같은 메일(같은 영화 오픈을 여러 명이 기다린 경우 등)은
+      SMTP_MAX_RCPT 명씩 묶어서 sendmail 한 번으로 보냄
+    - 묶음들은 SMTP_MAX_CONNECTIONS 개의 연결로 동시에 발송
+    """
+    if not pending:
+        return []
+    if not SMTP_CONFIGURED:
+        print("[run_checks] ⚠ SMTP 환경변수(CATCHSEAT_SMTP_USER / "
+              "CATCHSEAT_SMTP_PASS 또는 CATCHSEAT_SMTP_PASSWORD)가 설정되어 있지 않아 "
+              f"메일 {len(pending)}건을 전송하지 않습니다.")
+        return []
+
+    buckets: dict[tuple[str, str], list[tuple[int, str]]] = {}
+    for alert_id, to_email, subject, body in pending:
+        buckets.setdefault((subject, body), []).append((alert_id, to_email))
+
+    jobs = [
+        (subject, body, rcpts[i:i + SMTP_MAX_RCPT])
+        for (subject, body), rcpts in buckets.items()
+        for i in range(0, len(rcpts), SMTP_MAX_RCPT)
+    ]
+
+    workers = max(1, min(SMTP_MAX_CONNECTIONS, len(jobs)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as ex:
+            results = list(ex.map(lambda job: _send_bucket(*job, label), jobs))
+    finally:
+        # 발송 스레드는 여기서 끝나므로 그 스레드들의 연결도 같이 닫음
+        close_smtp()
+
+    sent_ids = [alert_id for ok_ids in results for alert_id in ok_ids]
+    RUN_STATS["errors"] += len(pending) - len(sent_ids)
+    return sent_ids
+
 
 def _get_alert_recipient_email(alert) -> str | None:
     """
@@ -115,36 +329,61 @@ def _get_alert_recipient_email(alert) -> str | None:
     return None
 
 
+# --- 메일 본문 템플릿 (고정 문구는 모듈 로드 때 한 번만 만들고 발송 때는 값만 채움) ---
+OPEN_ALERT_BODY_TPL = (
+    "안녕하세요, Catch-Seat입니다.\n\n"
+    "요청하신 영화 예매 오픈 알림을 알려드립니다.\n\n"
+    "알림신청 키워드: {keyword}\n"
+    "영화: {movie_title}\n"
+    "영화관: {theater_label}\n"
+    "상영관: {screen}\n"
+    "날짜: {date_str}"
+    "{zone_block}\n\n"
+    "{brand_label} 예매 페이지에서 좌석 상황을 확인해 주세요.\n\n"
+    "- 이 메일은 자동 발송되었습니다."
+)
+# 인기 좌석 구역 안내 (오픈 알림에서만, 데이터가 있는 경우에만 추가)
+OPEN_ALERT_ZONE_TPL = "\n\n인기 좌석 구역 안내:\n{zone_summary}"
+
+SEAT_ALERT_BODY_TPL = (
+    "안녕하세요, Catch-Seat입니다.\n\n"
+    "요청하신 좌석 취소 알림 조건을 만족하는 상영 회차가 발견되었습니다.\n\n"
+    "영화: {movie_title}\n"
+    "영화관: {theater_label}\n"
+    "상영관: {screen}\n"
+    "상영 일시: {dt_str}\n\n"
+    "기준 잔여 좌석 수(baseline): {baseline_available}석\n"
+    "현재 잔여 좌석 수: {current_available}석\n"
+    "증가한 좌석 수: {diff}석\n"
+    "{brand_label} 예매 페이지에서 좌석 상황을 확인해 주세요.\n\n"
+    "- 이 메일은 자동 발송되었습니다."
+)
+
+
 # ---------------------------------------------------------------------------
 #   1) 오픈 알림 (MovieOpenAlert) 메일 발송
 # ---------------------------------------------------------------------------
 
-def send_open_alert_email(
+def build_open_alert_email(
     alert: MovieOpenAlert,
     real_movie_title: str | None = None,
     theater_name: str | None = None,
-) -> bool:
+    today: datetime.date | None = None,
+) -> tuple[str, str, str] | None:
     """
-    영화 예매 오픈 시, 해당 알림 대상자에게 메일을 전송한다.
+    영화 예매 오픈 알림 메일의 (받는 사람, 제목, 본문)을 만든다.
 
     real_movie_title : 실제 편성에 잡힌 영화 제목 (예: '주토피아 2')
     theater_name     : 지점명 (예: '메가박스 코엑스')
+    today            : alert.date가 없을 때 표시할 날짜 (run_checks는 실행 시작 시 한 번 구해서 넘김)
 
-    반환값:
-        True  -> 메일 전송 성공
-        False -> 전송 실패 (SMTP 설정 누락/오류 등)
+    반환값: 수신자 이메일이 없으면 None
     """
 
-    if not SMTP_USER or not SMTP_PASS:
-        print("[run_checks] ⚠ SMTP 환경변수(CATCHSEAT_SMTP_USER / "
-              "CATCHSEAT_SMTP_PASS 또는 CATCHSEAT_SMTP_PASSWORD)가 설정되어 있지 않아 "
-              "메일을 전송하지 않습니다.")
-        return False
-
     to_email = _get_alert_recipient_email(alert)
     if not to_email:
         print(f"[run_checks] ⚠ MovieOpenAlert id={alert.id} 에 연결된 수신자 이메일이 없습니다. 메일 전송 생략.")
-        return False
+        return None
 
     keyword = alert.movie                          # 사용자가 입력한 키워드 (예: '주토피아')
     movie_title = real_movie_title or keyword      # 실제 영화 제목 (없으면 키워드와 동일하게)
@@ -161,7 +400,7 @@ def send_open_alert_email(
     brand_label = "메가박스"
 
     # alert에 date 필드가 있으면 사용, 없으면 오늘 날짜로 표시
-    alert_date = getattr(alert, "date", None)
+    alert_date = alert.date
     if isinstance(alert_date, datetime.date):
         date_str = alert_date.strftime("%Y-%m-%d")
     elif alert_date:
@@ -172,63 +411,24 @@ def send_open_alert_email(
         else:
             date_str = s
     else:
-        date_str = datetime.date.today().strftime("%Y-%m-%d")
+        date_str = (today or datetime.date.today()).strftime("%Y-%m-%d")
 
     # 🔎 인기 좌석 구역 요약 (seat_zone_summary.json 기반)
     zone_summary = get_zone_summary(branch_code)
 
     # 메일 본문 구성
-    lines = [
-        "안녕하세요, Catch-Seat입니다.",
-        "",
-        "요청하신 영화 예매 오픈 알림을 알려드립니다.",
-        "",
-        f"알림신청 키워드: {keyword}",
-        f"영화: {movie_title}",
-        f"영화관: {theater_label}",
-        f"상영관: {screen}",
-        f"날짜: {date_str}",
-    ]
-
-    # 인기 좌석 구역 안내는 오픈 알림에서만, 데이터가 있는 경우에만 추가
-    if zone_summary:
-        lines.extend(
-            [
-                "",
-                "인기 좌석 구역 안내:",
-                zone_summary,
-            ]
-        )
-
-    lines.extend(
-        [
-            "",
-            f"{brand_label} 예매 페이지에서 좌석 상황을 확인해 주세요.",
-            "",
-            "- 이 메일은 자동 발송되었습니다.",
-        ]
+    body = OPEN_ALERT_BODY_TPL.format(
+        keyword=keyword,
+        movie_title=movie_title,
+        theater_label=theater_label,
+        screen=screen,
+        date_str=date_str,
+        zone_block=OPEN_ALERT_ZONE_TPL.format(zone_summary=zone_summary) if zone_summary else "",
+        brand_label=brand_label,
     )
 
-    body = "\n".join(lines)
-
-    msg = MIMEText(body, _charset="utf-8")
-    msg["Subject"] = f"[Catch-Seat] '{movie_title}' 예매가 열렸어요!"
-    msg["From"] = SENDER_HEADER
-    msg["To"] = to_email
-
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            if SMTP_USE_TLS:
-                server.starttls()
-            server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(SMTP_USER, [to_email], msg.as_string())
-
-        print(f"[run_checks] ✉ 메일 전송 완료: to={to_email}, MovieOpenAlert id={alert.id}")
-        return True
-
-    except Exception as e:
-        print(f"[run_checks] ❌ 메일 전송 실패: to={to_email}, MovieOpenAlert id={alert.id}, error={e}")
-        return False
+    subject = f"[Catch-Seat] '{movie_title}' 예매가 열렸어요!"
+    return to_email, subject, body
 
 
 def _get_alert_date_str(alert: MovieOpenAlert, today_yyyymmdd: str) -> str:
@@ -237,7 +437,7 @@ def _get_alert_date_str(alert: MovieOpenAlert, today_yyyymmdd: str) -> str:
     - alert.date가 있으면 그걸 사용 (date객체/문자열 모두 대응)
     - 없으면 today_yyyymmdd 사용
     """
-    alert_date = getattr(alert, "date", None)
+    alert_date = alert.date
 
     if isinstance(alert_date, datetime.date):
         return alert_date.strftime("%Y%m%d")
@@ -246,51 +446,78 @@ def _get_alert_date_str(alert: MovieOpenAlert, today_yyyymmdd: str) -> str:
     return today_yyyymmdd
 
 
-def _extract_real_movie_title(alert: MovieOpenAlert, showtimes: list) -> str | None:
+def _extract_real_movie_title(alert: MovieOpenAlert, titles: dict[str, None]) -> str | None:
     """
-    showtimes 리스트에서 alert.movie 키워드가 포함된 실제 영화 제목을 찾아 반환.
-    (키 이름은 프로젝트 구조에 따라 'movie_title' / 'title' / 'movie' 등을 시도)
+    그룹의 영화 제목 목록(dict.fromkeys로 중복 제거, 편성 순서 유지)에서
+    alert.movie 키워드가 포함된 실제 영화 제목을 찾아 반환.
+    - 키워드가 제목과 정확히 같으면(대부분의 경우) 해시 조회로 바로 반환
+    - 아니면 편성 순서대로 부분 문자열 검색
     """
     keyword = (alert.movie or "").strip()
     if not keyword:
         return None
 
-    for st in showtimes:
-        if not isinstance(st, dict):
-            continue
-        title = (
-            st.get("movie_title")
-            or st.get("title")
-            or st.get("movie")
-            or ""
-        )
+    if keyword in titles:
+        return keyword
+
+    for title in titles:
         if keyword in title:
             return title
 
     return None
 
 
+def _mark_sent(model, ids, now) -> None:
+    """메일 발송에 성공한 알림들을 UPDATE 한 번으로 '보냄' 처리 (알림마다 UPDATE하지 않음)"""
+    if not ids:
+        return
+    db.session.execute(
+        update(model)
+        .where(model.id.in_(ids))
+        .values(is_sent=True, sent_at=now, send_count=func.coalesce(model.send_count, 0) + 1)
+    )
+
+
 def run_movie_open_checks():
     """메가박스 DOLBY 기반 영화 오픈 알림 전체 체크"""
 
-    today_yyyymmdd = datetime.date.today().strftime("%Y%m%d")
+    today = datetime.date.today()
+    today_yyyymmdd = today.strftime("%Y%m%d")
+    # 이번 실행의 기준 시각 (쿨다운 판정 / last_checked / sent_at 모두 같은 값)
+    run_now = utc_now()
 
     with app.app_context():
+        # 쿨다운/발송 완료 여부(can_send_now)는 SQL에서 걸러서 발송 가능한 알림만 가져옴
+        # 메일은 별도 스레드에서 보내므로 수신자(alert.user)를 미리 같이 로드 (스레드에서 lazy load 방지)
+        # 상태 갱신은 id 기준 UPDATE로 하므로 여기서 실제로 읽는 컬럼만 SELECT
         alerts = (
             MovieOpenAlert.query
-            .filter_by(active=True)
+            .options(
+                load_only(
+                    MovieOpenAlert.id,
+                    MovieOpenAlert.user_id,
+                    MovieOpenAlert.movie,
+                    MovieOpenAlert.theater,
+                    MovieOpenAlert.screen,
+                    MovieOpenAlert.date,
+                ),
+                joinedload(MovieOpenAlert.user).load_only(User.email),
+            )
+            .filter(MovieOpenAlert.can_send_now_clause(run_now))
             .all()
         )
 
         if not alerts:
-            print("[run_checks] 활성화된 MovieOpenAlert 가 없습니다.")
+            print("[run_checks] 발송 가능한 MovieOpenAlert 가 없습니다.")
             return
 
+        RUN_STATS["movie_active"] = len(alerts)
         print(f"[run_checks] 활성화된 MovieOpenAlert 개수: {len(alerts)}")
         print(f"[run_checks] 오늘 날짜 기준(기본값): {today_yyyymmdd}")
 
         # 지점 + 날짜별 그룹핑
-        grouped = {}  # (branch_code, date_yyyymmdd) -> [alerts...]
+        # (setdefault처럼 알림마다 빈 리스트를 만들지 않도록 defaultdict 사용)
+        grouped: defaultdict[tuple[str, str], list[MovieOpenAlert]] = defaultdict(list)
 
         for alert in alerts:
             branch_code = (alert.theater or "").strip()
@@ -298,11 +525,14 @@ def run_movie_open_checks():
                 print(f"  - [경고] MovieOpenAlert id={alert.id} 에 theater(지점 코드)가 없습니다. 건너뜀.")
                 continue
 
-            date_yyyymmdd = _get_alert_date_str(alert, today_yyyymmdd)
-            key = (branch_code, date_yyyymmdd)
-            grouped.setdefault(key, []).append(alert)
+            grouped[(branch_code, _get_alert_date_str(alert, today_yyyymmdd))].append(alert)
 
-        # 각 (지점, 날짜)마다 한 번만 크롤링
+        # 상태 변경(last_checked / 발송 표시)은 id만 모아 두었다가 마지막에 UPDATE 한 번씩
+        checked_ids: list[int] = []
+        pending: list = []   # (alert_id, 받는 사람, 제목, 본문) - 스캔이 끝난 뒤 한꺼번에 발송
+
+        # 각 (지점, 날짜)마다 한 번만, 그룹끼리는 동시에 크롤링
+        showtimes_by_key = megabox.get_showtimes_batch(grouped)
         for (branch_code, date_yyyymmdd), alerts_in_group in grouped.items():
             theater_name = BRANCH_CODE_TO_NAME.get(branch_code)
 
@@ -311,60 +541,87 @@ def run_movie_open_checks():
                 f"branch_code={branch_code}, date={date_yyyymmdd}, alerts={len(alerts_in_group)}개"
             )
 
-            try:
-                showtimes = megabox.get_showtimes(branch_code, date_yyyymmdd)
-            except Exception as e:
-                print(f"  - [에러] 메가박스 크롤링 실패: {e}")
+            showtimes = showtimes_by_key[(branch_code, date_yyyymmdd)]
+            if isinstance(showtimes, Exception):
+                RUN_STATS["errors"] += 1
+                print(f"  - [에러] 메가박스 크롤링 실패: {showtimes}")
                 continue
 
             print(f"  - get_showtimes() → DOLBY 상영 {len(showtimes)}개")
 
-            now = datetime.datetime.utcnow()
+            if not showtimes:
+                # DOLBY 상영이 없으면 오픈일 수 없으므로 알림별 판별 없이 '체크함'만 기록
+                checked_ids.extend(alert.id for alert in alerts_in_group)
+                print("  - [OPEN] DOLBY 상영이 없어 이 그룹은 건너뜁니다.")
+                continue
+
+            # 이 그룹의 알림들이 같이 쓰는 (영화 제목 → 상영관) 인덱스 / 실제 제목 목록
+            showtime_index = megabox.build_showtime_index(showtimes)
+            movie_titles = dict.fromkeys(st.movie_title for st in showtimes if st.movie_title)
+            real_titles: dict[str, str | None] = {}   # 키워드 -> 실제 제목
+            # (키워드, 상영관) -> 예매 오픈 여부 (지점/날짜는 그룹 안에서 같으므로 받는 사람만 다른 알림은 한 번만 판별)
+            open_by_filter: dict[tuple[str | None, str | None], bool] = {}
+
             triggered_any = False
 
             for alert in alerts_in_group:
-                if not alert.can_send_now(now=now):
-                    print(f"    · MovieOpenAlert id={alert.id} (movie='{alert.movie}') "
-                          f"→ can_send_now=False, 건너뜀.")
-                    continue
-
-                is_open = megabox.is_open_now(alert, showtimes)
+                checked_ids.append(alert.id)
+                filter_key = (alert.movie, alert.screen)
+                is_open = open_by_filter.get(filter_key)
+                if is_open is None:
+                    is_open = open_by_filter[filter_key] = megabox.is_open_now(alert, index=showtime_index)
 
                 if not is_open:
-                    print(f"    · MovieOpenAlert id={alert.id} (movie='{alert.movie}') "
-                          f"→ 아직 예매 오픈 아님.")
+                    if DEBUG_LOG:
+                        print(f"    · MovieOpenAlert id={alert.id} (movie='{alert.movie}') "
+                              f"→ 아직 예매 오픈 아님.")
                     continue
 
                 # 여기까지 왔으면 "예매 오픈" 조건 만족
                 triggered_any = True
 
-                # 실제 영화 제목 추출
-                real_title = _extract_real_movie_title(alert, showtimes)
+                # 실제 영화 제목 추출 (같은 키워드 알림이 여럿이면 제목 목록은 키워드당 한 번만 훑음)
+                keyword = (alert.movie or "").strip()
+                if keyword not in real_titles:
+                    real_titles[keyword] = _extract_real_movie_title(alert, movie_titles)
+                real_title = real_titles[keyword]
 
+                RUN_STATS["triggered"] += 1
                 print(f"    ✅ [TRIGGER-OPEN] MovieOpenAlert id={alert.id} / "
                       f"keyword='{alert.movie}' / real_title='{real_title or alert.movie}' / "
                       f"theater='{alert.theater}' / screen='{alert.screen}'")
 
-                # 메일 발송 시도 (알림 키워드 + 실제 제목 + 지점명 포함, 인기 좌석 정보 포함)
-                mail_ok = send_open_alert_email(
+                # 메일 발송 예약 (알림 키워드 + 실제 제목 + 지점명 포함, 인기 좌석 정보 포함)
+                mail = build_open_alert_email(
                     alert,
                     real_movie_title=real_title,
                     theater_name=theater_name,
+                    today=today,
                 )
+                if mail is not None:
+                    pending.append((alert.id, *mail))
 
-                if mail_ok:
-                    alert.is_sent = True
-                    alert.sent_at = now
-                    alert.send_count = (alert.send_count or 0) + 1
-                    alert.last_checked = now
-                else:
-                    alert.last_checked = now
+            if not triggered_any:
+                print("  - [OPEN] 이번 실행에서 트리거된 알림은 없습니다.")
 
-            if triggered_any:
+        sent_ids = _send_pending(pending, "MovieOpenAlert")
+
+        if checked_ids:
+            db.session.execute(
+                update(MovieOpenAlert)
+                .where(MovieOpenAlert.id.in_(checked_ids))
+                .values(last_checked=run_now)
+            )
+            _mark_sent(MovieOpenAlert, sent_ids, run_now)
+            # 실행 전체에서 커밋은 한 번만 (실패하면 롤백; 다음 실행에서 다시 체크됨)
+            try:
                 db.session.commit()
-                print("  - [OPEN] 트리거된 알림이 있어 DB에 변경 내용을 커밋했습니다.")
+            except Exception as e:
+                db.session.rollback()
+                RUN_STATS["errors"] += 1
+                print(f"  - [에러] [OPEN] 알림 상태 DB 커밋 실패, 롤백했습니다: {e}")
             else:
-                print("  - [OPEN] 이번 실행에서 트리거된 알림은 없습니다.")
+                print(f"  - [OPEN] 체크 {len(checked_ids)}건 / 발송 {len(sent_ids)}건 상태를 DB에 커밋했습니다.")
 
 
 # ---------------------------------------------------------------------------
@@ -378,14 +635,14 @@ def _get_date_from_show_datetime(show_dt, fallback_yyyymmdd: str) -> str:
     - 문자열인 경우: 숫자만 모아서 앞 8자리 사용 (예: '2025-12-08 18:30' -> '20251208')
     - 실패 시 fallback_yyyymmdd 사용
     """
-    if isinstance(show_dt, datetime.datetime):
-        return show_dt.strftime("%Y%m%d")
-
-    if isinstance(show_dt, datetime.date):
+    # DB에서 읽은 값은 거의 항상 datetime 이므로 타입 검사 없이 바로 포맷 (date도 동일)
+    try:
         return show_dt.strftime("%Y%m%d")
+    except AttributeError:
+        pass
 
     if isinstance(show_dt, str) and show_dt.strip():
-        s = "".join(ch for ch in show_dt if ch.isdigit())
+        s = "".join(_DIGITS_RE.findall(show_dt))
         if len(s) >= 8:
             return s[:8]
 
@@ -399,96 +656,116 @@ def _get_time_hm_from_show_datetime(show_dt) -> str | None:
     - 문자열: 숫자만 모아 뒤에서 4자리 사용 (예: '202512081830' -> '1830')
     - 실패 시 None
     """
-    if isinstance(show_dt, datetime.datetime):
-        return show_dt.strftime("%H%M")
+    try:
+        hm = show_dt.strftime("%H%M")
+    except AttributeError:
+        pass
+    else:
+        # date 에도 strftime 이 있지만 시간 정보가 없으므로('0000') datetime 일 때만 사용
+        return hm if isinstance(show_dt, datetime.datetime) else None
 
     if isinstance(show_dt, str) and show_dt.strip():
-        digits = "".join(ch for ch in show_dt if ch.isdigit())
+        digits = "".join(_DIGITS_RE.findall(show_dt))
         if len(digits) >= 4:
             return digits[-4:]
 
     return None
 
 
+@lru_cache(maxsize=256)
 def _normalize_screen_name(name: str | None) -> str:
     """
     상영관 이름 비교를 위한 간단 정규화:
     - 공백 제거
+    (DOLBY 상영관 이름은 종류가 몇 개 안 되므로 결과를 캐시)
     """
     if not name:
         return ""
     return "".join(name.split())
 
 
-def _extract_time_hm_from_showtime(st: dict) -> str | None:
-    """
-    크롤링된 showtime dict에서 상영 시작 시간을 'HHMM' 형식으로 추출.
-    실제 구조에 맞춰 'start_time'을 우선 사용한다.
-    """
-    if not isinstance(st, dict):
-        return None
-
-    candidate = (
-        st.get("start_time")          # 실제 키: '09:15'
-        or st.get("time")
-        or st.get("start_datetime")
-        or st.get("datetime")
-        or st.get("show_time")
-    )
-
-    if isinstance(candidate, datetime.datetime):
-        return candidate.strftime("%H%M")
-
+def _extract_time_hm_from_showtime(st: megabox.Showtime) -> str | None:
+    """showtime의 상영 시작 시간('09:15')을 'HHMM' 형식으로 추출."""
+    candidate = st.start_time
+    if isinstance(candidate, str):
+        # 크롤러가 넘기는 형태는 거의 항상 'HH:MM' → 숫자 추출 없이 바로 처리
+        m = _TIME_COLON_RE.match(candidate)
+        if m:
+            return m.group(1) + m.group(2)
     if isinstance(candidate, str) and candidate.strip():
-        digits = "".join(ch for ch in candidate if ch.isdigit())
+        digits = "".join(_DIGITS_RE.findall(candidate))
         if len(digits) >= 4:
             return digits[-4:]
 
     return None
 
 
-def _match_showtime_for_seat_alert(alert: SeatCancelAlert, showtimes: list) -> dict | None:
+def _build_seat_showtime_index(showtimes: list[megabox.Showtime]):
+    """
+    좌석 알림 매칭용 인덱스 (그룹마다 한 번만 만들어서 알림들이 같이 사용).
+
+    반환값 (rows, by_key, loose):
+    - rows  : [(showtime, 정규화 상영관 이름, 'HHMM'), ...]  (원래 순서 유지)
+    - by_key: (정규화 상영관 이름, 'HHMM') -> rows 위치 목록
+    - loose : 상영관 이름이나 시간이 비어 있어서 어떤 알림과도 맞을 수 있는 rows 위치 목록
+    """
+    rows = []
+    by_key: dict[tuple[str, str], list[int]] = {}
+    loose: list[int] = []
+
+    for i, st in enumerate(showtimes):
+        norm_screen = _normalize_screen_name(st.screen_name)
+        time_hm = _extract_time_hm_from_showtime(st)
+        rows.append((st, norm_screen, time_hm))
+        if norm_screen and time_hm:
+            by_key.setdefault((norm_screen, time_hm), []).append(i)
+        else:
+            loose.append(i)
+
+    return rows, by_key, loose
+
+
+def _match_showtime_for_seat_alert(
+    alert: SeatCancelAlert, showtimes: list[megabox.Showtime], index=None
+) -> megabox.Showtime | None:
     """
-    SeatCancelAlert가 가리키는 상영 회차에 해당하는 showtime dict 한 개를 찾는다.
+    SeatCancelAlert가 가리키는 상영 회차에 해당하는 showtime 한 개를 찾는다.
 
     매칭 기준 (최대한 보수적으로):
-    - 영화 제목: alert.movie 가 showtime['movie_title'] 등 title 계열 키에 포함
-    - 상영관 이름: alert.screen 과 showtime['screen_name'] 등 screen 계열 키가
-                   (공백 제거 후) 일치
+    - 영화 제목: alert.movie 가 showtime.movie_title 에 포함
+    - 상영관 이름: alert.screen 과 showtime.screen_name 이 (공백 제거 후) 일치
     - 상영 시간(HHMM): alert.show_datetime 기반 'HHMM' 과 showtime 시간 'HHMM' 일치
+
+    index: _build_seat_showtime_index(showtimes) 결과 (없으면 여기서 만듦)
     """
+    if index is None:
+        index = _build_seat_showtime_index(showtimes)
+    rows, by_key, loose = index
+
     keyword = (alert.movie or "").strip()
-    target_screen = _normalize_screen_name(getattr(alert, "screen", None))
-    target_time_hm = _get_time_hm_from_show_datetime(getattr(alert, "show_datetime", None))
+    target_screen = _normalize_screen_name(alert.screen)
+    target_time_hm = _get_time_hm_from_show_datetime(alert.show_datetime)
+
+    if target_screen and target_time_hm:
+        # (상영관, 시간)이 같은 회차 + 상영관/시간 정보가 없는 회차만 후보 (원래 순서대로)
+        positions = by_key.get((target_screen, target_time_hm), [])
+        if loose:
+            positions = sorted(positions + loose)
+    else:
+        positions = range(len(rows))
 
-    for st in showtimes:
-        if not isinstance(st, dict):
-            continue
+    for i in positions:
+        st, norm_st_screen, st_time_hm = rows[i]
 
         # 영화 제목 매칭
-        title = (
-            st.get("movie_title")      # 실제 키
-            or st.get("title")
-            or st.get("movie")
-            or ""
-        )
-        if keyword and keyword not in title:
+        if keyword and keyword not in (st.movie_title or ""):
             continue
 
         # 상영관 이름 비교
-        st_screen = (
-            st.get("screen_name")      # 실제 키
-            or st.get("screen")
-            or st.get("theater_screen")
-            or st.get("theater_name2")
-        )
-        norm_st_screen = _normalize_screen_name(st_screen)
-
         if target_screen and norm_st_screen and target_screen != norm_st_screen:
             continue
 
         # 시간 비교
-        st_time_hm = _extract_time_hm_from_showtime(st)
         if target_time_hm and st_time_hm and target_time_hm != st_time_hm:
             continue
 
@@ -498,75 +775,42 @@ def _match_showtime_for_seat_alert(alert: SeatCancelAlert, showtimes: list) -> d
     return None
 
 
-def _get_available_seats_from_show(st: dict) -> int | None:
+def _get_available_seats_from_show(st: megabox.Showtime) -> int | None:
     """
-    showtime dict에서 '현재 잔여 좌석 수'를 추출.
-
-    실제 Megabox DOLBY 크롤러 구조:
-        'seats_status': '잔여 152석'
-    형태를 우선적으로 파싱한다.
+    showtime에서 '현재 잔여 좌석 수'를 추출.
+    (Megabox DOLBY 크롤러: seats_status = '잔여 152석')
     """
-    if not isinstance(st, dict):
-        return None
-
-    # 1) 실제 확인된 키: seats_status = "잔여 152석"
-    status = st.get("seats_status")
+    status = st.seats_status
     if isinstance(status, str) and status.strip():
-        digits = "".join(ch for ch in status if ch.isdigit())
-        if digits:
-            return int(digits)
-
-    # 2) 혹시 모를 다른 숫자형 필드들에 대한 보조 처리 (있으면 사용, 없으면 무시)
-    candidate_keys = [
-        "available_seats",
-        "remain_cnt",
-        "remaining_seats",
-        "seat_remain_cnt",
-        "seat_count_remain",
-    ]
-
-    for key in candidate_keys:
-        v = st.get(key)
-        if isinstance(v, (int, float)):
-            if v >= 0:
-                return int(v)
-        elif isinstance(v, str) and v.strip().isdigit():
-            val = int(v.strip())
-            if val >= 0:
-                return val
+        # '잔여 152석' → 첫 숫자 묶음
+        m = _DIGITS_RE.search(status)
+        if m:
+            return int(m.group())
 
     return None
 
 
-def send_seat_cancel_email(
+def build_seat_cancel_email(
     alert: SeatCancelAlert,
     theater_name: str | None,
     baseline_available: int,
     current_available: int,
-    desired_count: int,
-) -> bool:
+) -> tuple[str, str, str] | None:
     """
-    좌석 취소 알림 조건 충족 시 사용자에게 메일 발송.
+    좌석 취소 알림 메일의 (받는 사람, 제목, 본문)을 만든다. 수신자 이메일이 없으면 None.
 
     - baseline_available: 기준 시점 잔여 좌석 수
     - current_available : 현재 잔여 좌석 수
-    - desired_count     : 사용자가 원하는 좌석 수
     """
 
-    if not SMTP_USER or not SMTP_PASS:
-        print("[run_checks] ⚠ SMTP 환경변수(CATCHSEAT_SMTP_USER / "
-              "CATCHSEAT_SMTP_PASS 또는 CATCHSEAT_SMTP_PASSWORD)가 설정되어 있지 않아 "
-              "메일을 전송하지 않습니다.")
-        return False
-
     to_email = _get_alert_recipient_email(alert)
     if not to_email:
         print(f"[run_checks] ⚠ SeatCancelAlert id={alert.id} 에 연결된 수신자 이메일이 없습니다. 메일 전송 생략.")
-        return False
+        return None
 
     movie_title = (alert.movie or "").strip() or "(제목 미지정)"
     branch_code = (alert.theater or "").strip()
-    screen = getattr(alert, "screen", None) or "(상영관 미지정)"
+    screen = alert.screen or "(상영관 미지정)"
 
     theater_label = (
         theater_name
@@ -575,7 +819,7 @@ def send_seat_cancel_email(
 
     brand_label = "메가박스"
 
-    show_dt = getattr(alert, "show_datetime", None)
+    show_dt = alert.show_datetime
     if isinstance(show_dt, datetime.datetime):
         dt_str = show_dt.strftime("%Y-%m-%d %H:%M")
     elif isinstance(show_dt, datetime.date):
@@ -586,38 +830,17 @@ def send_seat_cancel_email(
     diff = current_available - baseline_available
 
     subject = f"[Catch-Seat] 좌석이 다시 풀렸어요! - {movie_title} / {theater_label}"
-    body = (
-        f"안녕하세요, Catch-Seat입니다.\n\n"
-        f"요청하신 좌석 취소 알림 조건을 만족하는 상영 회차가 발견되었습니다.\n\n"
-        f"영화: {movie_title}\n"
-        f"영화관: {theater_label}\n"
-        f"상영관: {screen}\n"
-        f"상영 일시: {dt_str}\n\n"
-        f"기준 잔여 좌석 수(baseline): {baseline_available}석\n"
-        f"현재 잔여 좌석 수: {current_available}석\n"
-        f"증가한 좌석 수: {diff}석\n"
-        f"{brand_label} 예매 페이지에서 좌석 상황을 확인해 주세요.\n\n"
-        f"- 이 메일은 자동 발송되었습니다."
+    body = SEAT_ALERT_BODY_TPL.format(
+        movie_title=movie_title,
+        theater_label=theater_label,
+        screen=screen,
+        dt_str=dt_str,
+        baseline_available=baseline_available,
+        current_available=current_available,
+        diff=diff,
+        brand_label=brand_label,
     )
-
-    msg = MIMEText(body, _charset="utf-8")
-    msg["Subject"] = subject
-    msg["From"] = SENDER_HEADER
-    msg["To"] = to_email
-
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            if SMTP_USE_TLS:
-                server.starttls()
-            server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(SMTP_USER, [to_email], msg.as_string())
-
-        print(f"[run_checks] ✉ 메일 전송 완료: to={to_email}, SeatCancelAlert id={alert.id}")
-        return True
-
-    except Exception as e:
-        print(f"[run_checks] ❌ 메일 전송 실패: to={to_email}, SeatCancelAlert id={alert.id}, error={e}")
-        return False
+    return to_email, subject, body
 
 
 def run_seat_cancel_checks():
@@ -629,35 +852,55 @@ def run_seat_cancel_checks():
     """
 
     today_yyyymmdd = datetime.date.today().strftime("%Y%m%d")
+    # 이번 실행의 기준 시각 (쿨다운 판정 / last_checked / sent_at 모두 같은 값)
+    run_now = utc_now()
 
     with app.app_context():
+        # 상태 갱신은 id 기준 UPDATE로 하므로 여기서 실제로 읽는 컬럼만 SELECT
         alerts = (
             SeatCancelAlert.query
-            .filter_by(active=True, is_sent=False)
+            .options(
+                load_only(
+                    SeatCancelAlert.id,
+                    SeatCancelAlert.user_id,
+                    SeatCancelAlert.movie,
+                    SeatCancelAlert.theater,
+                    SeatCancelAlert.screen,
+                    SeatCancelAlert.show_datetime,
+                    SeatCancelAlert.baseline_available_seats,
+                    SeatCancelAlert.desired_count,
+                ),
+                joinedload(SeatCancelAlert.user).load_only(User.email),
+            )
+            .filter(SeatCancelAlert.can_send_now_clause(run_now))
             .all()
         )
 
         if not alerts:
-            print("[run_checks] 활성화된 SeatCancelAlert 가 없습니다.")
+            print("[run_checks] 발송 가능한 SeatCancelAlert 가 없습니다.")
             return
 
+        RUN_STATS["seat_active"] = len(alerts)
         print(f"[run_checks] 활성화된 SeatCancelAlert 개수: {len(alerts)}")
 
         # 지점 + 날짜별 그룹핑 (show_datetime 기준)
-        grouped: dict[tuple[str, str], list[SeatCancelAlert]] = {}
+        grouped: defaultdict[tuple[str, str], list[SeatCancelAlert]] = defaultdict(list)
 
         for alert in alerts:
-            branch_code = (getattr(alert, "theater", "") or "").strip()
+            branch_code = (alert.theater or "").strip()
             if not branch_code:
                 print(f"  - [경고] SeatCancelAlert id={alert.id} 에 theater(지점 코드)가 없습니다. 건너뜀.")
                 continue
 
-            show_dt = getattr(alert, "show_datetime", None)
-            date_yyyymmdd = _get_date_from_show_datetime(show_dt, today_yyyymmdd)
-            key = (branch_code, date_yyyymmdd)
-            grouped.setdefault(key, []).append(alert)
+            date_yyyymmdd = _get_date_from_show_datetime(alert.show_datetime, today_yyyymmdd)
+            grouped[(branch_code, date_yyyymmdd)].append(alert)
+
+        # 잔여 좌석/last_checked 는 (id, 값) 목록으로, 발송 표시는 id만 모아서 마지막에 한 번에 UPDATE
+        seat_updates: list[dict] = []
+        pending: list = []   # (alert_id, 받는 사람, 제목, 본문) - 스캔이 끝난 뒤 한꺼번에 발송
 
-        # 각 (지점, 날짜)마다 한 번만 크롤링
+        # 각 (지점, 날짜)마다 한 번만, 그룹끼리는 동시에 크롤링
+        showtimes_by_key = megabox.get_showtimes_batch(grouped)
         for (branch_code, date_yyyymmdd), alerts_in_group in grouped.items():
             theater_name = BRANCH_CODE_TO_NAME.get(branch_code)
 
@@ -666,92 +909,106 @@ def run_seat_cancel_checks():
                 f"branch_code={branch_code}, date={date_yyyymmdd}, alerts={len(alerts_in_group)}개"
             )
 
-            try:
-                showtimes = megabox.get_showtimes(branch_code, date_yyyymmdd)
-            except Exception as e:
-                print(f"  - [에러] 메가박스 크롤링 실패: {e}")
+            showtimes = showtimes_by_key[(branch_code, date_yyyymmdd)]
+            if isinstance(showtimes, Exception):
+                RUN_STATS["errors"] += 1
+                print(f"  - [에러] 메가박스 크롤링 실패: {showtimes}")
                 continue
 
             print(f"  - get_showtimes() → DOLBY 상영 {len(showtimes)}개")
 
-            now = datetime.datetime.utcnow()
+            if not showtimes:
+                # 매칭될 회차가 없음 (회차를 못 찾은 알림은 원래도 갱신하지 않음)
+                print("  - [SEAT] DOLBY 상영이 없어 이 그룹은 건너뜁니다.")
+                continue
+
+            # 이 그룹의 알림들이 같이 쓰는 (상영관, 시간) → 회차 인덱스
+            seat_index = _build_seat_showtime_index(showtimes)
             triggered_any = False
-            updated_any = False
 
             for alert in alerts_in_group:
-                if not alert.can_send_now(now=now):
-                    print(f"    · SeatCancelAlert id={alert.id} (movie='{alert.movie}') "
-                          f"→ can_send_now=False, 건너뜀.")
-                    continue
-
-                baseline = getattr(alert, "baseline_available_seats", None)
-                desired = getattr(alert, "desired_count", None)
+                baseline = alert.baseline_available_seats
+                desired = alert.desired_count
 
                 if baseline is None:
-                    print(f"    · SeatCancelAlert id={alert.id} → baseline_available_seats가 없습니다. 건너뜀.")
+                    if DEBUG_LOG:
+                        print(f"    · SeatCancelAlert id={alert.id} → baseline_available_seats가 없습니다. 건너뜀.")
                     continue
                 if desired is None or desired <= 0:
-                    print(f"    · SeatCancelAlert id={alert.id} → desired_count가 유효하지 않습니다. 건너뜀.")
+                    if DEBUG_LOG:
+                        print(f"    · SeatCancelAlert id={alert.id} → desired_count가 유효하지 않습니다. 건너뜀.")
                     continue
 
-                matched_show = _match_showtime_for_seat_alert(alert, showtimes)
+                matched_show = _match_showtime_for_seat_alert(alert, showtimes, seat_index)
                 if not matched_show:
-                    print(f"    · SeatCancelAlert id={alert.id} → 매칭되는 상영 회차를 찾지 못했습니다.")
+                    if DEBUG_LOG:
+                        print(f"    · SeatCancelAlert id={alert.id} → 매칭되는 상영 회차를 찾지 못했습니다.")
                     continue
 
                 current_available = _get_available_seats_from_show(matched_show)
 
                 # --- 여기부터 매진(0석) 처리 추가 ---
                 if current_available is None:
-                    seats_status = str(matched_show.get("seats_status", "")).strip()
+                    seats_status = (matched_show.seats_status or "").strip()
                     if "매진" in seats_status:
                         # 매진인 경우는 0석으로 간주
                         current_available = 0
                     else:
-                        print(f"    · SeatCancelAlert id={alert.id} → showtime에서 잔여 좌석 수를 읽지 못했습니다.")
+                        if DEBUG_LOG:
+                            print(f"    · SeatCancelAlert id={alert.id} → showtime에서 잔여 좌석 수를 읽지 못했습니다.")
                         continue
                 # --- 매진 처리 끝 ---
 
                 diff = current_available - baseline
 
-                print(
-                    f"    · SeatCancelAlert id={alert.id} / movie='{alert.movie}' / "
-                    f"screen='{alert.screen}' / baseline={baseline}, current={current_available}, "
-                    f"desired={desired}, diff={diff}"
-                )
+                if DEBUG_LOG:
+                    print(
+                        f"    · SeatCancelAlert id={alert.id} / movie='{alert.movie}' / "
+                        f"screen='{alert.screen}' / baseline={baseline}, current={current_available}, "
+                        f"desired={desired}, diff={diff}"
+                    )
 
                 # 항상 last_available_seats & last_checked 업데이트
-                alert.last_available_seats = current_available
-                alert.last_checked = now
-                updated_any = True
+                seat_updates.append(
+                    {"id": alert.id, "last_available_seats": current_available, "last_checked": run_now}
+                )
 
                 if diff >= desired:
                     # 트리거 조건 충족
                     triggered_any = True
 
-                    print(f"    ✅ [TRIGGER-SEAT] SeatCancelAlert id={alert.id} → 조건 만족, 메일 발송 시도")
+                    RUN_STATS["triggered"] += 1
+                    print(f"    ✅ [TRIGGER-SEAT] SeatCancelAlert id={alert.id} → 조건 만족, 메일 발송 예약")
 
-                    mail_ok = send_seat_cancel_email(
+                    mail = build_seat_cancel_email(
                         alert,
                         theater_name=theater_name,
                         baseline_available=baseline,
                         current_available=current_available,
-                        desired_count=desired,
                     )
+                    if mail is not None:
+                        pending.append((alert.id, *mail))
 
-                    if mail_ok:
-                        alert.is_sent = True
-                        alert.sent_at = now
-                        alert.send_count = (alert.send_count or 0) + 1
+            if not triggered_any:
+                print("  - [SEAT] 이번 실행에서 트리거된 알림은 없습니다.")
 
-            if triggered_any or updated_any:
+        sent_ids = _send_pending(pending, "SeatCancelAlert")
+
+        if seat_updates:
+            # 기본키 기준 bulk UPDATE (executemany 한 번)
+            db.session.execute(update(SeatCancelAlert), seat_updates)
+            _mark_sent(SeatCancelAlert, sent_ids, run_now)
+            # 실행 전체에서 커밋은 한 번만 (실패하면 롤백; 다음 실행에서 다시 체크됨)
+            try:
                 db.session.commit()
-                if triggered_any:
-                    print("  - [SEAT] 트리거된 알림 및 상태 변경을 DB에 커밋했습니다.")
-                else:
-                    print("  - [SEAT] 트리거는 없지만 last_available_seats/last_checked 갱신을 커밋했습니다.")
+            except Exception as e:
+                db.session.rollback()
+                RUN_STATS["errors"] += 1
+                print(f"  - [에러] [SEAT] 알림 상태 DB 커밋 실패, 롤백했습니다: {e}")
             else:
-                print("  - [SEAT] 이번 실행에서 변경된 알림이 없습니다.")
+                print(f"  - [SEAT] 체크 {len(seat_updates)}건 / 발송 {len(sent_ids)}건 상태를 DB에 커밋했습니다.")
+        else:
+            print("  - [SEAT] 이번 실행에서 변경된 알림이 없습니다.")
 
 
 # ---------------------------------------------------------------------------
@@ -759,9 +1016,22 @@ def run_seat_cancel_checks():
 #   python3 run_checks.py 실행 시 두 알림을 모두 체크
 # ---------------------------------------------------------------------------
 
-if __name__ == "__main__":
-    # 1) 영화 예매 오픈 알림 체크
-    run_movie_open_checks()
+def run_all_checks() -> Counter:
+    """
+    영화 오픈 알림 → 좌석 취소 알림 순서로 한 번 체크하고, 이번 실행의 집계(RUN_STATS)를 반환.
+    (scheduler.py가 프로세스 안에서 바로 호출)
+    """
+    RUN_STATS.clear()
+    try:
+        # 1) 영화 예매 오픈 알림 체크
+        run_movie_open_checks()
+
+        # 2) 좌석 취소 알림 체크
+        run_seat_cancel_checks()
+    finally:
+        close_smtp()
+    return Counter(RUN_STATS)
 
-    # 2) 좌석 취소 알림 체크
-    run_seat_cancel_checks()
+
+if __name__ == "__main__":
+    run_all_checks()
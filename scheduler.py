@@ -1,120 +1,39 @@
-import os
-import sys
 import datetime
-import subprocess
-from typing import Tuple
+import traceback
 
 from apscheduler.schedulers.blocking import BlockingScheduler
 
-
-# 프로젝트 루트 경로 (이 파일이 프로젝트 루트에 있다고 가정)
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-
-# run_checks.py 경로
-RUN_CHECKS_PATH = os.path.join(PROJECT_ROOT, "run_checks.py")
-
-
-def parse_run_checks_output(stdout: str) -> Tuple[int, int, int, int]:
-    """
-    run_checks.py의 stdout 문자열을 받아서
-    - 활성화된 MovieOpenAlert 개수
-    - 활성화된 SeatCancelAlert 개수
-    - 트리거된 알림 개수 (OPEN + SEAT 합산)
-    - 에러/실패 로그 라인 수
-    를 집계한다.
-    """
-    movie_active = 0
-    seat_active = 0
-    triggered_count = 0
-    error_count = 0
-
-    for line in stdout.splitlines():
-        line = line.strip()
-
-        # 활성화된 MovieOpenAlert 개수 라인
-        # 예) [run_checks] 활성화된 MovieOpenAlert 개수: 2
-        if "활성화된 MovieOpenAlert 개수" in line:
-            parts = line.split(":")
-            if len(parts) >= 2:
-                try:
-                    movie_active = int(parts[-1].strip())
-                except ValueError:
-                    pass
-
-        # 활성화된 SeatCancelAlert 개수 라인
-        # 예) [run_checks] 활성화된 SeatCancelAlert 개수: 3
-        if "활성화된 SeatCancelAlert 개수" in line:
-            parts = line.split(":")
-            if len(parts) >= 2:
-                try:
-                    seat_active = int(parts[-1].strip())
-                except ValueError:
-                    pass
-
-        # 트리거 라인 (OPEN / SEAT 공통)
-        # 예) ✅ [TRIGGER] ...
-        #     ✅ [TRIGGER-SEAT] ...
-        if "[TRIGGER" in line:
-            triggered_count += 1
-
-        # 에러/실패 라인
-        # 예)   - [에러] 메가박스 크롤링 실패: ...
-        if "[에러]" in line or "실패" in line:
-            error_count += 1
-
-    return movie_active, seat_active, triggered_count, error_count
+# 매 주기마다 서브프로세스로 run_checks.py를 새로 띄우지 않고 (인터프리터/Flask/SQLAlchemy 초기화 반복 X)
+# 한 번 import 해 둔 모듈의 함수를 프로세스 안에서 바로 호출
+import run_checks
 
 
 def run_movie_open_checks():
     """
-    MovieOpenAlert 및 SeatCancelAlert 전체를 검사하는 run_checks.py를
-    서브프로세스로 실행하는 래퍼 함수.
+    MovieOpenAlert 및 SeatCancelAlert 전체를 검사하는 run_checks.run_all_checks()를
+    호출하고, 집계(run_checks.RUN_STATS)로 실행 요약을 출력하는 래퍼 함수.
     APScheduler가 이 함수를 주기적으로 호출한다.
     """
     now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[scheduler] {now} - run_checks.py 실행 시작")
-
-    # Python 인터프리터는 현재 인터프리터(sys.executable)를 그대로 사용
-    cmd = [sys.executable, RUN_CHECKS_PATH]
+    print(f"[scheduler] {now} - run_checks 실행 시작")
 
     try:
-        completed = subprocess.run(
-            cmd,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-
-        print("[scheduler] run_checks.py 실행 성공")
-        print("========== run_checks.py stdout ==========")
-        stdout = (completed.stdout or "").strip()
-        if stdout:
-            print(stdout)
-        else:
-            print("(표시할 stdout이 없습니다.)")
-        print("=============== (stdout 끝) =============")
-
-        if completed.stderr.strip():
-            print("========== run_checks.py stderr ==========")
-            print(completed.stderr.strip())
-            print("=============== (stderr 끝) =============")
+        stats = run_checks.run_all_checks()
+    except Exception:
+        # 한 번 실패해도 스케줄러는 계속 돌도록 예외는 여기서 로그만 남김
+        print("[scheduler] run_checks 실행 실패")
+        print(traceback.format_exc().strip())
+        return
 
-        # --- 여기서 run_checks.py 출력 요약 ---
-        movie_active, seat_active, triggered, errors = parse_run_checks_output(stdout)
-        print("\n---------- 실행 요약 (scheduler) ----------")
-        print(f"· 활성화된 MovieOpenAlert 개수: {movie_active}")
-        print(f"· 활성화된 SeatCancelAlert 개수: {seat_active}")
-        print(f"· 이번 실행에서 트리거된 알림 수: {triggered}")
-        print(f"· 에러/실패 로그 라인 수: {errors}")
-        print("-----------------------------------------\n")
+    print("[scheduler] run_checks 실행 성공")
 
-    except subprocess.CalledProcessError as e:
-        print("[scheduler] run_checks.py 실행 실패")
-        print(f"  - returncode: {e.returncode}")
-        print("---------- 실패 stdout ----------")
-        print((e.stdout or "").strip())
-        print("---------- 실패 stderr ----------")
-        print((e.stderr or "").strip())
+    # --- 여기서 run_checks 실행 요약 ---
+    print("\n---------- 실행 요약 (scheduler) ----------")
+    print(f"· 활성화된 MovieOpenAlert 개수: {stats['movie_active']}")
+    print(f"· 활성화된 SeatCancelAlert 개수: {stats['seat_active']}")
+    print(f"· 이번 실행에서 트리거된 알림 수: {stats['triggered']}")
+    print(f"· 에러/실패 건수: {stats['errors']}")
+    print("-----------------------------------------\n")
 
 
 def main():
@@ -135,7 +54,7 @@ def main():
     )
 
     print("[scheduler] APScheduler 시작")
-    print("[scheduler] 10분 간격으로 run_checks.py를 실행합니다.")
+    print("[scheduler] 10분 간격으로 run_checks를 실행합니다.")
     print("[scheduler] 첫 실행을 바로 한 번 수행합니다.\n")
 
     # 서버 띄우자마자 한 번 즉시 실행